@@ -0,0 +1,170 @@
+from datetime import datetime
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+
+from jobscraper.exporter import EXPORT_DIR, MAIN_CSV, jobstreet_job_id
+from jobscraper.store import normalize_description
+
+logger = logging.getLogger(__name__.capitalize())
+
+FINGERPRINT_STORE = os.path.join(EXPORT_DIR, "fingerprints.sqlite3")
+
+CDC_CSV = MAIN_CSV + ["change_type", "changed_fields"]
+
+# id is a per-run counter and the same job shows up under several keywords,
+# the posted date is recomputed from "Posted N days ago" on every run
+VOLATILE_FIELDS = {"id", "search_keyword", "job_posted_date"}
+FINGERPRINT_FIELDS = [c for c in MAIN_CSV if c not in VOLATILE_FIELDS] + [
+    "job_requirements"
+]
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+
+
+def _normalize(field, value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "; ".join(value)
+    if field == "job_requirements":
+        return normalize_description(value)
+    return str(value)
+
+
+def field_hashes(job: dict) -> dict:
+    return {
+        field: hashlib.sha1(_normalize(field, job.get(field)).encode("utf-8")).hexdigest()[:16]
+        for field in FINGERPRINT_FIELDS
+    }
+
+
+def fingerprint(hashes: dict) -> str:
+    joined = "".join(hashes[field] for field in FINGERPRINT_FIELDS)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+
+class ChangeTracker:
+    # Keeps a fingerprint per JobStreet job id across runs and turns each
+    # batch into change records: new jobs are tagged insert, jobs whose
+    # fields changed are tagged update with the changed field names, and
+    # unchanged jobs are dropped. Jobs are tombstoned per search keyword and
+    # location, so only a tracker that knows its run's location can do it.
+    def __init__(
+        self, path: str = FINGERPRINT_STORE, run_id: str = None, location: str = None
+    ):
+        self.path = path
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.location = location
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            "job_key TEXT PRIMARY KEY, "
+            "fingerprint TEXT NOT NULL, "
+            "field_hashes TEXT NOT NULL, "
+            "search_keyword TEXT, "
+            "location TEXT, "
+            "job_url TEXT, "
+            "first_seen TEXT NOT NULL, "
+            "last_seen TEXT NOT NULL, "
+            "deleted INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(fingerprints)")]
+        if "location" not in columns:
+            # stores from before locations were tracked are never tombstoned
+            self.conn.execute("ALTER TABLE fingerprints ADD COLUMN location TEXT")
+        self.conn.commit()
+        self.counts = {INSERT: 0, UPDATE: 0, DELETE: 0, "unchanged": 0}
+
+    def _classify(self, job: dict):
+        key = jobstreet_job_id(job.get("job_url")) or job.get("job_url")
+        if not key:
+            self.counts[INSERT] += 1
+            return {**job, "change_type": INSERT, "changed_fields": None}
+
+        hashes = field_hashes(job)
+        digest = fingerprint(hashes)
+        row = self.conn.execute(
+            "SELECT fingerprint, field_hashes, deleted FROM fingerprints WHERE job_key = ?",
+            (key,),
+        ).fetchone()
+        self.conn.execute(
+            "INSERT INTO fingerprints (job_key, fingerprint, field_hashes, "
+            "search_keyword, location, job_url, first_seen, last_seen) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (job_key) DO UPDATE SET fingerprint = excluded.fingerprint, "
+            "field_hashes = excluded.field_hashes, "
+            "search_keyword = excluded.search_keyword, "
+            "location = COALESCE(excluded.location, location), "
+            "job_url = excluded.job_url, "
+            "last_seen = excluded.last_seen, deleted = 0",
+            (
+                key,
+                digest,
+                json.dumps(hashes),
+                job.get("search_keyword"),
+                self.location,
+                job.get("job_url"),
+                self.run_id,
+                self.run_id,
+            ),
+        )
+
+        if row is None or row[2]:
+            self.counts[INSERT] += 1
+            return {**job, "change_type": INSERT, "changed_fields": None}
+        if row[0] == digest:
+            self.counts["unchanged"] += 1
+            return None
+
+        previous = json.loads(row[1])
+        changed = [f for f in FINGERPRINT_FIELDS if previous.get(f) != hashes[f]]
+        self.counts[UPDATE] += 1
+        return {**job, "change_type": UPDATE, "changed_fields": "; ".join(changed)}
+
+    def capture(self, batch: list[dict]) -> list[dict]:
+        with self.conn:
+            changes = [self._classify(job) for job in batch]
+        return [change for change in changes if change is not None]
+
+    def tombstones(self, keywords: list[str], first_id: int = 1) -> list[dict]:
+        # jobs of the crawled keywords in this location that this run did
+        # not see any more
+        if self.location is None or not keywords:
+            return []
+        placeholders = ", ".join("?" for _ in keywords)
+        with self.conn:
+            rows = self.conn.execute(
+                "SELECT job_key, search_keyword, job_url FROM fingerprints "
+                "WHERE deleted = 0 AND last_seen != ? AND location = ? "
+                f"AND search_keyword IN ({placeholders}) ORDER BY job_key",
+                (self.run_id, self.location, *keywords),
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE fingerprints SET deleted = 1, last_seen = ? WHERE job_key = ?",
+                [(self.run_id, key) for key, _, _ in rows],
+            )
+        self.counts[DELETE] += len(rows)
+        return [
+            {
+                "id": first_id + offset,
+                "search_keyword": keyword,
+                "job_url": job_url,
+                "change_type": DELETE,
+                "changed_fields": None,
+            }
+            for offset, (_, keyword, job_url) in enumerate(rows)
+        ]
+
+    def summary(self) -> str:
+        return ", ".join(f"{count} {kind}" for kind, count in self.counts.items())
+
+    def close(self):
+        self.conn.close()
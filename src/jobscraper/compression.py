@@ -0,0 +1,199 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import io
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__.capitalize())
+
+CODECS = ("gzip", "zstd", "lz4", "none")
+EXTENSIONS = {"gzip": ".gz", "zstd": ".zst", "lz4": ".lz4", "none": ""}
+DEFAULT_LEVELS = {"gzip": 9, "zstd": 3, "lz4": 0, "none": None}
+LEVEL_RANGES = {"gzip": (0, 9), "zstd": (-7, 22), "lz4": (0, 16), "none": None}
+BLOCK_SIZE = 1 << 20
+
+
+class Codec:
+    def __init__(self, name: str, level: int = None):
+        if name not in CODECS:
+            raise ValueError(f"Unknown codec {name}, choose from {', '.join(CODECS)}")
+        if level is not None:
+            # checked here, a bad level would otherwise fail in a worker thread
+            if LEVEL_RANGES[name] is None:
+                raise ValueError(f"The {name} codec takes no compression level")
+            low, high = LEVEL_RANGES[name]
+            if not low <= level <= high:
+                raise ValueError(f"{name} compression level must be {low} to {high}")
+        self.name = name
+        self.level = DEFAULT_LEVELS[name] if level is None else level
+        self.extension = EXTENSIONS[name]
+        self._module = _load_module(name)
+
+    def __str__(self):
+        return self.name if self.level is None else f"{self.name}-{self.level}"
+
+    def compress(self, data: bytes) -> bytes:
+        # every block is a complete gzip member or zstd/lz4 frame, and
+        # concatenated members/frames decode as one stream
+        if self.name == "gzip":
+            return gzip.compress(data, compresslevel=self.level, mtime=0)
+        if self.name == "zstd":
+            return self._module.ZstdCompressor(level=self.level).compress(data)
+        if self.name == "lz4":
+            return self._module.compress(data, compression_level=self.level)
+        return data
+
+
+def _load_module(name: str):
+    try:
+        if name == "zstd":
+            import zstandard
+
+            return zstandard
+        if name == "lz4":
+            import lz4.frame
+
+            return lz4.frame
+    except ImportError:
+        package = {"zstd": "zstandard", "lz4": "lz4"}[name]
+        raise ValueError(f"The {name} codec needs the {package} package installed")
+    return None
+
+
+def codec_for_path(path: str):
+    for name, extension in EXTENSIONS.items():
+        if extension and path.endswith(extension):
+            return name
+    return "none"
+
+
+def open_text(path: str, mode: str = "rt"):
+    name = codec_for_path(path)
+    if name == "gzip":
+        return gzip.open(path, mode, newline="", encoding="utf-8")
+    if name == "none":
+        return open(path, mode[0], newline="", encoding="utf-8")
+    if mode[0] != "r":
+        raise ValueError(f"Writing {name} text files is done with CompressedWriter")
+    module = _load_module(name)
+    if name == "zstd":
+        raw = module.ZstdDecompressor().stream_reader(
+            open(path, "rb"), read_across_frames=True, closefd=True
+        )
+    else:
+        raw = module.open(path, "rb")
+    return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+
+
+class CompressionStats:
+    def __init__(self):
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self.cpu_seconds = 0.0
+
+    def add(self, other):
+        self.raw_bytes += other.raw_bytes
+        self.compressed_bytes += other.compressed_bytes
+        self.cpu_seconds += other.cpu_seconds
+
+    @property
+    def ratio(self) -> float:
+        return self.raw_bytes / self.compressed_bytes if self.compressed_bytes else 0.0
+
+    @property
+    def throughput(self) -> float:
+        # MB/s of input per compression thread
+        return self.raw_bytes / self.cpu_seconds / 1e6 if self.cpu_seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.raw_bytes / 1e6:.1f} MB -> {self.compressed_bytes / 1e6:.1f} MB "
+            f"({self.ratio:.2f}x), {self.throughput:.1f} MB/s per thread"
+        )
+
+
+class CompressedWriter:
+    # Buffers text and compresses it in blocks of block_size, on a thread
+    # pool when workers > 1 (zlib, zstd and lz4 release the GIL). Blocks
+    # are written to the file in order as they finish.
+    def __init__(
+        self, path: str, codec: Codec, block_size: int = BLOCK_SIZE, workers: int = 1
+    ):
+        self.path = path
+        self.codec = codec
+        self.block_size = block_size
+        self.stats = CompressionStats()
+        self._file = open(path, "ab")
+        self._buffer = bytearray()
+        self._pool = ThreadPoolExecutor(workers) if workers > 1 else None
+        self._max_pending = workers * 2
+        self._pending = deque()
+
+    def _compress(self, block: bytes):
+        start = time.thread_time()
+        data = self.codec.compress(block)
+        return data, time.thread_time() - start
+
+    def _write_result(self, result, raw_size: int):
+        data, seconds = result
+        self._file.write(data)
+        self.stats.raw_bytes += raw_size
+        self.stats.compressed_bytes += len(data)
+        self.stats.cpu_seconds += seconds
+
+    def _drain(self, wait_all: bool = False):
+        while self._pending and (
+            wait_all or self._pending[0][0].done() or len(self._pending) > self._max_pending
+        ):
+            future, raw_size = self._pending.popleft()
+            self._write_result(future.result(), raw_size)
+
+    def _submit(self, block: bytes):
+        if self._pool is None:
+            self._write_result(self._compress(block), len(block))
+            return
+        self._pending.append((self._pool.submit(self._compress, block), len(block)))
+        self._drain()
+
+    def write(self, text: str):
+        self._buffer += text.encode("utf-8")
+        while len(self._buffer) >= self.block_size:
+            block = bytes(self._buffer[: self.block_size])
+            del self._buffer[: self.block_size]
+            self._submit(block)
+
+    def flush(self, wait: bool = False):
+        # submit what is buffered as a (short) block without waiting for it,
+        # so compression stays off the caller's path. Finished blocks are
+        # written in order by the next write or flush, a batch reaches the
+        # disk at the latest with the batch after it. close() waits.
+        if self._buffer:
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        self._drain(wait_all=wait)
+        self._file.flush()
+
+    @property
+    def bytes_in(self) -> int:
+        pending = sum(raw_size for _, raw_size in self._pending)
+        return self.stats.raw_bytes + pending + len(self._buffer)
+
+    def estimated_size(self) -> int:
+        # compressed bytes so far plus the unflushed input at the observed ratio
+        unflushed = self.bytes_in - self.stats.raw_bytes
+        ratio = self.stats.ratio or 1.0
+        return self.stats.compressed_bytes + int(unflushed / ratio)
+
+    def close(self):
+        self.flush(wait=True)
+        if self._pool is not None:
+            self._pool.shutdown()
+        self._file.close()
+        logger.info(f"Compressed {self.path} with {self.codec}: {self.stats.summary()}")
+        return self.stats
+
+
+def default_workers() -> int:
+    return min(4, os.cpu_count() or 1)
@@ -1,13 +1,16 @@
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.webdriver.firefox.firefox_profile import FirefoxProfile
-from selenium import webdriver
-
 import logging
 import os
 
 
 logger = logging.getLogger(__name__.capitalize())
 
+# the only OTP the local simulator accepts unless told otherwise
+DEFAULT_OTP = "123456"
+
+
+def is_valid_otp(code: str) -> bool:
+    return code.isdigit() and len(code) == 6
+
 
 def init_logging(log_dir="logs", log_file="jobstreet_scraper.log", log_console=False):
     os.makedirs(log_dir, exist_ok=True)
@@ -25,11 +28,18 @@ def init_logging(log_dir="logs", log_file="jobstreet_scraper.log", log_console=F
     )
 
 
-def init_firefox_driver():
+def init_firefox_driver(headless=False):
+    # selenium is imported here so offline commands never pay for it
+    from selenium.webdriver.firefox.options import Options as FirefoxOptions
+    from selenium.webdriver.firefox.firefox_profile import FirefoxProfile
+    from selenium import webdriver
+
     try:
         options = FirefoxOptions()
         firefox_profile = FirefoxProfile()
         options.profile = firefox_profile
+        if headless:
+            options.add_argument("-headless")
 
         options.set_preference("dom.webnotifications.enabled", False)
         options.set_preference("dom.push.enabled", False)
@@ -45,10 +55,12 @@ def init_firefox_driver():
         raise
 
 
-def init_driver():
+def init_driver(tracer=None, headless=False):
     try:
-        driver = init_firefox_driver()
+        driver = init_firefox_driver(headless=headless)
         logger.info(f"Web driver {driver.name} initialized successfully")
+        if tracer is not None:
+            tracer.install(driver)
         return driver
     except Exception as e:
         logger.error(f"Error initializing web driver: {e}")
@@ -0,0 +1,250 @@
+from contextlib import contextmanager
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from jobscraper.exporter import EXPORT_DIR
+
+logger = logging.getLogger(__name__.capitalize())
+
+TASK_QUEUE = os.path.join(EXPORT_DIR, "tasks.sqlite3")
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+# job ids of a task start at task id * TASK_ID_SPAN, so workers writing to
+# the same directory never reuse an id; a results page has about 30 jobs
+TASK_ID_SPAN = 10_000
+
+
+class Task:
+    def __init__(self, id, keyword, location, page, attempts):
+        self.id = id
+        self.keyword = keyword
+        self.location = location
+        self.page = page
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"Task({self.id}, {self.keyword!r}, {self.location!r}, page={self.page})"
+
+
+class TaskQueue:
+    # (keyword, location, page) tasks in a shared SQLite file. A claim
+    # leases a task to one worker; leases are extended by heartbeats and
+    # tasks whose lease expires go back to pending for another worker.
+    def __init__(self, path: str = TASK_QUEUE, max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "keyword TEXT NOT NULL, "
+                "location TEXT NOT NULL, "
+                "page INTEGER NOT NULL, "
+                "status TEXT NOT NULL DEFAULT 'pending', "
+                "owner TEXT, "
+                "lease_expires REAL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "error TEXT, "
+                "UNIQUE (keyword, location, page))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # a fresh connection per operation keeps heartbeat threads safe
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def add(self, keyword: str, location: str, page: int = 1) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO tasks (keyword, location, page) VALUES (?, ?, ?)",
+                (keyword, location, page),
+            )
+            return cursor.rowcount == 1
+
+    def _requeue_expired(self, conn, now):
+        expired = conn.execute(
+            "SELECT id, owner FROM tasks WHERE status = ? AND lease_expires < ?",
+            (LEASED, now),
+        ).fetchall()
+        for task_id, owner in expired:
+            logger.warning(f"Lease of task {task_id} held by {owner} expired")
+        conn.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+            "owner = NULL, lease_expires = NULL, error = 'lease expired' "
+            "WHERE status = ? AND lease_expires < ?",
+            (self.max_attempts, FAILED, PENDING, LEASED, now),
+        )
+        return len(expired)
+
+    def requeue_expired(self) -> int:
+        with self._connect() as conn:
+            return self._requeue_expired(conn, time.time())
+
+    def claim(self, owner: str, lease: float):
+        now = time.time()
+        with self._connect() as conn:
+            self._requeue_expired(conn, now)
+            row = conn.execute(
+                "SELECT id, keyword, location, page, attempts FROM tasks "
+                "WHERE status = ? ORDER BY page, id LIMIT 1",
+                (PENDING,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = ?, owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (LEASED, owner, now + lease, row[0]),
+            )
+        task_id, keyword, location, page, attempts = row
+        return Task(task_id, keyword, location, page, attempts + 1)
+
+    def heartbeat(self, task_id: int, owner: str, lease: float) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ? "
+                "WHERE id = ? AND owner = ? AND status = ?",
+                (time.time() + lease, task_id, owner, LEASED),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, task_id: int, owner: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = ?, lease_expires = NULL, error = NULL "
+                "WHERE id = ? AND owner = ?",
+                (DONE, task_id, owner),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, task_id: int, owner: str, error: str):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "owner = NULL, lease_expires = NULL, error = ? "
+                "WHERE id = ? AND owner = ?",
+                (self.max_attempts, FAILED, PENDING, error, task_id, owner),
+            )
+
+    def counts(self) -> dict:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+            ).fetchall()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def is_drained(self) -> bool:
+        counts = self.counts()
+        return counts[PENDING] == 0 and counts[LEASED] == 0
+
+
+class Heartbeat:
+    def __init__(self, queue: TaskQueue, task: Task, owner: str, lease: float):
+        self.queue = queue
+        self.task = task
+        self.owner = owner
+        self.lease = lease
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.lease / 3):
+            try:
+                if not self.queue.heartbeat(self.task.id, self.owner, self.lease):
+                    self.lost = True
+                    logger.warning(f"Lost lease on {self.task}")
+                    return
+            except sqlite3.Error as e:
+                logger.warning(f"Heartbeat for {self.task} failed: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def default_worker_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def enqueue_search(queue: TaskQueue, keywords: list[str], location: str) -> int:
+    # only first pages are known up front, workers enqueue the next page
+    # whenever the page they scraped has one
+    added = 0
+    for keyword in keywords:
+        if queue.add(keyword, location, 1):
+            added += 1
+    return added
+
+
+def run_worker(
+    queue: TaskQueue,
+    scraper,
+    sink,
+    owner: str,
+    lease: float = 300,
+    max_pages=None,
+    poll_interval: float = 10,
+    exit_when_drained: bool = True,
+):
+    tasks_done = 0
+    while True:
+        task = queue.claim(owner, lease)
+        if task is None:
+            if exit_when_drained and queue.is_drained():
+                break
+            time.sleep(poll_interval)
+            continue
+
+        print(f"Worker {owner} claimed {task} (attempt {task.attempts})")
+        try:
+            with Heartbeat(queue, task, owner, lease) as heartbeat:
+                records, has_next = scraper.scrape_page(
+                    task.keyword, task.location, task.page, first_id=task.id * TASK_ID_SPAN
+                )
+        except Exception as e:
+            logger.error(f"{task} failed: {e}")
+            queue.fail(task.id, owner, str(e))
+            continue
+
+        # another worker may have the task by now and export it too; a last
+        # heartbeat also keeps the lease while the records are written
+        if heartbeat.lost or not queue.heartbeat(task.id, owner, lease):
+            logger.warning(f"{task} finished after its lease expired, dropping its jobs")
+            continue
+
+        sink(records)
+        if has_next and (max_pages is None or task.page < max_pages):
+            queue.add(task.keyword, task.location, task.page + 1)
+        if not queue.complete(task.id, owner):
+            logger.warning(f"{task} was handed to another worker before it completed")
+            continue
+        tasks_done += 1
+        print(f"Worker {owner} completed {task} with {len(records)} jobs")
+
+    return tasks_done
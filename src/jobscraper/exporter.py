@@ -1,8 +1,15 @@
 import csv
 from datetime import datetime
 import gzip
+import hashlib
+import io
+import json
 import logging
 import os
+import re
+import time
+
+from jobscraper.compression import CompressedWriter, CompressionStats, Codec
 
 logger = logging.getLogger(__name__.capitalize())
 
@@ -30,17 +37,36 @@ SECONDARY_CSV = [
     "job_requirements",
 ]
 
+SECONDARY_CSV_HASHED = [
+    "job_id",
+    "description_hash",
+]
+
+
+def jobstreet_job_id(job_url):
+    match = re.search(r"/job/(\d+)", job_url or "")
+    return match.group(1) if match else None
 
-def create_timestamped_file(prefix: str, extension: str) -> str:
+
+def create_timestamped_file(
+    prefix: str, extension: str, directory: str = EXPORT_DIR
+) -> str:
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"{prefix}_{timestamp}.{extension}"
 
-    os.makedirs(EXPORT_DIR, exist_ok=True)
-    return os.path.join(EXPORT_DIR, filename)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, filename)
 
 
 def export_to_csv(
-    batch_jobs_data, main_filename, sec_filename, append=True, header_written=False
+    batch_jobs_data,
+    main_filename,
+    sec_filename,
+    append=True,
+    header_written=False,
+    description_store=None,
+    sec_writer=None,
+    main_columns=MAIN_CSV,
 ):
 
     if not batch_jobs_data:
@@ -51,7 +77,7 @@ def export_to_csv(
 
     for job in batch_jobs_data:
         main_record = {}
-        for column in MAIN_CSV:
+        for column in main_columns:
             if column == "company_benefits" and isinstance(job.get(column), list):
                 main_record[column] = (
                     "; ".join(job[column]) if job.get(column) else None
@@ -65,23 +91,242 @@ def export_to_csv(
             secondary_data.append(
                 {"job_id": job.get("id"), "job_requirements": job["job_requirements"]}
             )
+
+    sec_fields = SECONDARY_CSV
+    if description_store is not None and secondary_data:
+        # reference descriptions by hash, the text lives in the shared store
+        hashes = description_store.put_many(
+            record["job_requirements"] for record in secondary_data
+        )
+        secondary_data = [
+            {"job_id": record["job_id"], "description_hash": digest}
+            for record, digest in zip(secondary_data, hashes)
+        ]
+        sec_fields = SECONDARY_CSV_HASHED
+
     write_header = not append or not header_written or not os.path.exists(main_filename)
     with open(main_filename, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=MAIN_CSV)
+        writer = csv.DictWriter(f, fieldnames=main_columns)
         if write_header:
             writer.writeheader()
         writer.writerows(main_data)
     logger.info(f"Exported {len(main_data)} main jobs to {main_filename}")
 
-    if secondary_data:
+    if secondary_data and sec_writer is not None:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=sec_fields)
+        if sec_writer.bytes_in == 0:
+            writer.writeheader()
+        writer.writerows(secondary_data)
+        sec_writer.write(buffer.getvalue())
+        sec_writer.flush()
+        logger.info(f"Exported {len(secondary_data)} secondary jobs to {sec_filename}")
+    elif secondary_data:
         write_header_sec = (
             not append or not header_written or not os.path.exists(sec_filename)
         )
         with gzip.open(sec_filename, "at", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=SECONDARY_CSV)
+            writer = csv.DictWriter(f, fieldnames=sec_fields)
             if write_header_sec:
                 writer.writeheader()
             writer.writerows(secondary_data)
         logger.info(f"Exported {len(secondary_data)} secondary jobs to {sec_filename}")
 
     return main_filename, sec_filename
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_json_atomic(path: str, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ShardedExporter:
+    # Writes export_to_csv batches into numbered main/secondary shard pairs,
+    # starting a new pair once a shard reaches max_rows, max_bytes or
+    # max_seconds. Every closed shard is listed in the run manifest with
+    # row counts, sizes and sha256 so loaders can pick up finished shards
+    # while the crawl is still running. Secondary shards go through a
+    # CompressedWriter with the chosen codec.
+    def __init__(
+        self,
+        main_prefix: str = "jobstreet_main",
+        sec_prefix: str = "jobstreet_sec",
+        directory: str = EXPORT_DIR,
+        max_rows: int = None,
+        max_bytes: int = None,
+        max_seconds: float = None,
+        description_store=None,
+        codec: Codec = None,
+        compress_workers: int = 1,
+        main_columns: list[str] = MAIN_CSV,
+    ):
+        self.main_prefix = main_prefix
+        self.sec_prefix = sec_prefix
+        self.directory = directory
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.description_store = description_store
+        self.codec = codec or Codec("gzip")
+        self.compress_workers = compress_workers
+        self.main_columns = main_columns
+        self.compression_stats = CompressionStats()
+        self.sharded = any(v is not None for v in (max_rows, max_bytes, max_seconds))
+
+        os.makedirs(directory, exist_ok=True)
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.manifest_path = os.path.join(
+            directory, f"{main_prefix}_{self.run_id}_manifest.json"
+        )
+        self.manifest = {
+            "run": self.run_id,
+            "complete": False,
+            "main_columns": main_columns,
+            "secondary_codec": str(self.codec),
+            "shards": [],
+        }
+        self.total_rows = 0
+        self.last_id = None
+        self.shard_number = 0
+        self._open_shard()
+        write_json_atomic(self.manifest_path, self.manifest)
+
+    def _shard_name(self, prefix: str, extension: str) -> str:
+        suffix = f"_{self.shard_number:05d}" if self.sharded else ""
+        return os.path.join(
+            self.directory, f"{prefix}_{self.run_id}{suffix}.{extension}"
+        )
+
+    def _open_shard(self):
+        self.shard_number += 1
+        self.main_filename = self._shard_name(self.main_prefix, "csv")
+        self.sec_filename = self._shard_name(
+            self.sec_prefix, f"csv{self.codec.extension}"
+        )
+        self.sec_writer = None
+        self.shard_rows = 0
+        self.shard_sec_rows = 0
+        self.shard_first_id = None
+        self.shard_last_id = None
+        self.shard_opened = time.time()
+
+    def _shard_bytes(self) -> int:
+        size = 0
+        if os.path.exists(self.main_filename):
+            size += os.path.getsize(self.main_filename)
+        if self.sec_writer is not None:
+            size += self.sec_writer.estimated_size()
+        return size
+
+    def _shard_full(self) -> bool:
+        if self.max_rows is not None and self.shard_rows >= self.max_rows:
+            return True
+        if self.max_bytes is not None and self._shard_bytes() >= self.max_bytes:
+            return True
+        if (
+            self.max_seconds is not None
+            and time.time() - self.shard_opened >= self.max_seconds
+        ):
+            return True
+        return False
+
+    def _file_entry(self, path: str, rows: int):
+        if not os.path.exists(path):
+            return None
+        return {
+            "path": os.path.basename(path),
+            "rows": rows,
+            "bytes": os.path.getsize(path),
+            "sha256": file_digest(path),
+        }
+
+    def _close_shard(self):
+        if self.sec_writer is not None:
+            self.compression_stats.add(self.sec_writer.close())
+            self.sec_writer = None
+        if self.shard_rows == 0:
+            return
+        self.manifest["shards"].append(
+            {
+                "shard": self.shard_number,
+                "first_id": self.shard_first_id,
+                "last_id": self.shard_last_id,
+                "closed_at": datetime.now().isoformat(timespec="seconds"),
+                "main": self._file_entry(self.main_filename, self.shard_rows),
+                "secondary": self._file_entry(self.sec_filename, self.shard_sec_rows),
+            }
+        )
+        write_json_atomic(self.manifest_path, self.manifest)
+        logger.info(
+            f"Closed shard {self.shard_number} with {self.shard_rows} jobs, "
+            f"manifest {self.manifest_path}"
+        )
+
+    def rotate(self):
+        self._close_shard()
+        self._open_shard()
+
+    def write(self, batch_jobs_data):
+        # returns the main/secondary shard the batch ended in, the current
+        # names may already point at the next, not yet written shard
+        pending = list(batch_jobs_data)
+        written = (None, None)
+        while pending:
+            # a time or size limit may have passed since the last batch
+            if self.shard_rows and self._shard_full():
+                self.rotate()
+            if self.max_rows is not None:
+                room = self.max_rows - self.shard_rows
+                chunk, pending = pending[:room], pending[room:]
+            else:
+                chunk, pending = pending, []
+
+            if self.sec_writer is None and any(
+                job.get("job_requirements") for job in chunk
+            ):
+                self.sec_writer = CompressedWriter(
+                    self.sec_filename, self.codec, workers=self.compress_workers
+                )
+            export_to_csv(
+                chunk,
+                main_filename=self.main_filename,
+                sec_filename=self.sec_filename,
+                header_written=self.shard_rows > 0,
+                description_store=self.description_store,
+                sec_writer=self.sec_writer,
+                main_columns=self.main_columns,
+            )
+            if self.shard_first_id is None:
+                self.shard_first_id = chunk[0].get("id")
+            self.shard_last_id = chunk[-1].get("id")
+            self.last_id = self.shard_last_id
+            self.shard_rows += len(chunk)
+            self.shard_sec_rows += sum(1 for job in chunk if job.get("job_requirements"))
+            self.total_rows += len(chunk)
+            written = (
+                self.main_filename,
+                self.sec_filename if self.sec_writer is not None else None,
+            )
+
+            if self._shard_full():
+                self.rotate()
+
+        return written
+
+    def close(self):
+        self._close_shard()
+        self.manifest["complete"] = True
+        write_json_atomic(self.manifest_path, self.manifest)
+        return self.manifest_path
@@ -0,0 +1,124 @@
+from contextlib import contextmanager
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # windows, pacing is then only shared within the process
+    fcntl = None
+
+logger = logging.getLogger(__name__.capitalize())
+
+GOVERNOR_STATE = os.path.join(tempfile.gettempdir(), "jobscraper_governor.json")
+
+# shared state older than this was left by a finished run and is not trusted
+STATE_TTL = 3600
+
+
+class PolitenessGovernor:
+    # AIMD pacing of browser actions: the shared request rate grows by
+    # `increase` after every healthy response and is cut by `decrease` on
+    # timeouts, blocks or slow responses. The rate and the next free slot
+    # live in a locked state file so every driver and process on the host
+    # draws from the same budget.
+    def __init__(
+        self,
+        state_path: str = GOVERNOR_STATE,
+        initial_rate: float = 1.0,
+        min_rate: float = 0.05,
+        max_rate: float = 4.0,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+        latency_target: float = 8.0,
+        latency_smoothing: float = 0.2,
+        sleep=time.sleep,
+    ):
+        self.state_path = state_path
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.latency_smoothing = latency_smoothing
+        self.sleep = sleep
+        self.latency = None
+        self.signals = {}
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _shared_state(self):
+        with self._lock, open(self.state_path, "a+", encoding="utf-8") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                try:
+                    state = json.loads(raw) if raw else {}
+                except json.JSONDecodeError:
+                    logger.warning(f"Corrupt governor state in {self.state_path}")
+                    state = {}
+                now = time.time()
+                if now - state.get("updated", 0) > STATE_TTL:
+                    state = {"rate": self.initial_rate, "next_slot": now}
+
+                yield state
+
+                state["updated"] = time.time()
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    @property
+    def rate(self) -> float:
+        with self._shared_state() as state:
+            return state["rate"]
+
+    def acquire(self) -> float:
+        with self._shared_state() as state:
+            now = time.time()
+            slot = max(now, state["next_slot"])
+            state["next_slot"] = slot + 1 / state["rate"]
+        wait = slot - now
+        if wait > 0:
+            self.sleep(wait)
+            self.waited += wait
+        return wait
+
+    def record_success(self, latency: float):
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.latency_smoothing * (latency - self.latency)
+
+        if self.latency > self.latency_target:
+            self.record_signal("slow")
+            return
+
+        with self._shared_state() as state:
+            state["rate"] = min(self.max_rate, state["rate"] + self.increase)
+
+    def record_signal(self, kind: str):
+        self.signals[kind] = self.signals.get(kind, 0) + 1
+        with self._shared_state() as state:
+            state["rate"] = max(self.min_rate, state["rate"] * self.decrease)
+            rate = state["rate"]
+        logger.warning(f"Backing off after {kind} signal, rate now {rate:.2f}/s")
+
+    def summary(self) -> str:
+        signals = ", ".join(f"{k}={v}" for k, v in sorted(self.signals.items()))
+        latency = f"{self.latency:.2f}s" if self.latency is not None else "n/a"
+        return (
+            f"rate {self.rate:.2f}/s, avg latency {latency}, "
+            f"waited {self.waited:.1f}s, signals: {signals or 'none'}"
+        )
@@ -1,37 +1,413 @@
-from jobscraper.scraper import JobScraper
-from jobscraper.configs import init_logging
-from jobscraper.exporter import export_to_csv, create_timestamped_file
+from jobscraper.configs import DEFAULT_OTP, init_logging, is_valid_otp
+from jobscraper.exporter import ShardedExporter, EXPORT_DIR, MAIN_CSV
+from jobscraper.compression import CODECS, Codec, default_workers
+from jobscraper.store import DescriptionStore, DESCRIPTION_STORE
+from jobscraper.governor import PolitenessGovernor, GOVERNOR_STATE
+from jobscraper.tracing import CommandTracer
+from jobscraper.recycling import BrowserHealth
+from jobscraper.changes import CDC_CSV, ChangeTracker, FINGERPRINT_STORE
+from jobscraper.scheduler import (
+    CrawlScheduler,
+    SCHEDULE_STATE,
+    SESSION_STATE,
+    load_session,
+    run_schedule,
+    save_session,
+)
+from jobscraper.distributed import (
+    TaskQueue,
+    TASK_QUEUE,
+    default_worker_name,
+    enqueue_search,
+    run_worker,
+)
+from jobscraper.postprocess import (
+    FORMATS,
+    convert_export,
+    expand_manifests,
+    export_stats,
+    merge_exports,
+)
 import argparse
+import os
+import sys
+import time
 
+COMMANDS = (
+    "scrape",
+    "coordinate",
+    "worker",
+    "schedule",
+    "merge",
+    "convert",
+    "stats",
+    "simulate",
+)
+
+
+def otp_code(value: str) -> str:
+    if not is_valid_otp(value):
+        raise argparse.ArgumentTypeError(f"OTP must be 6 digits, got {value!r}")
+    return value
+
+
+def cli(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # plain `jobscraper -e ... -k ... -l ...` keeps meaning scrape
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ("-h", "--help")):
+        argv = ["scrape", *argv]
 
-def cli():
     parser = argparse.ArgumentParser(description="Job Scraper CLI")
-    parser.add_argument("-e", type=str, required=True, help="Login email for JobStreet")
-    parser.add_argument("-k", type=str, required=True, help="Job search keyword")
-    parser.add_argument("-l", type=str, required=True, help="Job search location")
-    args = parser.parse_args()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    browser = argparse.ArgumentParser(add_help=False)
+    browser.add_argument("-e", type=str, required=True, help="Login email for JobStreet")
+    browser.add_argument(
+        "-d",
+        type=str,
+        nargs="?",
+        const=DESCRIPTION_STORE,
+        default=None,
+        help="Shared description store, secondary export references descriptions by hash",
+    )
+    browser.add_argument(
+        "-g",
+        type=str,
+        default=GOVERNOR_STATE,
+        help="Pacing state file shared by every scraper on this host",
+    )
+    browser.add_argument(
+        "-T",
+        type=str,
+        default=None,
+        help="Write a trace of every WebDriver command to this JSONL file",
+    )
+    browser.add_argument(
+        "--recycle-cards",
+        type=int,
+        default=None,
+        help="Replace the browser after this many job cards",
+    )
+    browser.add_argument(
+        "--recycle-mb",
+        type=float,
+        default=2048,
+        help="Replace the browser once it uses this much memory (needs psutil)",
+    )
+    browser.add_argument(
+        "--recycle-slowdown",
+        type=float,
+        default=1.5,
+        help="Replace the browser when cards get this many times slower",
+    )
+    browser.add_argument(
+        "--cdc",
+        type=str,
+        nargs="?",
+        const=FINGERPRINT_STORE,
+        default=None,
+        help="Only export new and changed jobs, tracked in this fingerprint store",
+    )
+    browser.add_argument(
+        "--shard-rows", type=int, default=None, help="Rotate exports every N jobs"
+    )
+    browser.add_argument(
+        "--shard-mb", type=float, default=None, help="Rotate exports at this size in MB"
+    )
+    browser.add_argument(
+        "--shard-minutes",
+        type=float,
+        default=None,
+        help="Rotate exports after this many minutes",
+    )
+    browser.add_argument(
+        "--codec",
+        type=str,
+        choices=CODECS,
+        default="gzip",
+        help="Compression of the secondary export",
+    )
+    browser.add_argument(
+        "--level", type=int, default=None, help="Compression level for the codec"
+    )
+    browser.add_argument(
+        "--compress-threads",
+        type=int,
+        default=default_workers(),
+        help="Threads compressing secondary export blocks",
+    )
+    browser.add_argument(
+        "--url",
+        type=str,
+        default="https://id.jobstreet.com/",
+        help="Site to scrape, e.g. a local `jobscraper simulate` server",
+    )
+    browser.add_argument(
+        "--otp",
+        type=otp_code,
+        default=None,
+        help="Use this OTP instead of prompting for it",
+    )
+    browser.add_argument(
+        "--headless", action="store_true", help="Run Firefox without a window"
+    )
+
+    scrape_parser = subparsers.add_parser(
+        "scrape", parents=[browser], help="Scrape jobs with a single browser"
+    )
+    scrape_parser.add_argument("-k", type=str, required=True, help="Job search keyword")
+    scrape_parser.add_argument("-l", type=str, required=True, help="Job search location")
+    scrape_parser.add_argument(
+        "--tombstones",
+        action="store_true",
+        help="With --cdc, export a delete record for jobs no longer listed",
+    )
+    scrape_parser.add_argument(
+        "--prefetch",
+        action="store_true",
+        help="Load the next results page in a second tab while extracting cards",
+    )
+    scrape_parser.set_defaults(func=scrape)
+
+    coordinate_parser = subparsers.add_parser(
+        "coordinate", help="Queue a distributed crawl for workers"
+    )
+    coordinate_parser.add_argument("-k", type=str, required=True, help="Job search keyword")
+    coordinate_parser.add_argument(
+        "-l", type=str, required=True, help="Job search location"
+    )
+    coordinate_parser.add_argument(
+        "-q", type=str, default=TASK_QUEUE, help="Shared task queue file"
+    )
+    coordinate_parser.add_argument(
+        "-w", action="store_true", help="Wait and report progress until the crawl ends"
+    )
+    coordinate_parser.set_defaults(func=coordinate)
+
+    worker_parser = subparsers.add_parser(
+        "worker", parents=[browser], help="Claim and scrape tasks from the queue"
+    )
+    worker_parser.add_argument(
+        "-q", type=str, default=TASK_QUEUE, help="Shared task queue file"
+    )
+    worker_parser.add_argument(
+        "-o", type=str, default=EXPORT_DIR, help="Shared output directory"
+    )
+    worker_parser.add_argument(
+        "-n", type=str, default=None, help="Worker name, defaults to host-pid"
+    )
+    worker_parser.add_argument(
+        "-p", type=int, default=None, help="Maximum pages per keyword"
+    )
+    worker_parser.add_argument(
+        "-t", type=float, default=300, help="Task lease in seconds"
+    )
+    worker_parser.set_defaults(func=worker)
+
+    schedule_parser = subparsers.add_parser(
+        "schedule",
+        parents=[browser],
+        help="Recrawl searches as often as they get new jobs, within a time budget",
+    )
+    schedule_parser.add_argument(
+        "-k", type=str, default=None, help="Job search keywords to add to the schedule"
+    )
+    schedule_parser.add_argument(
+        "-l", type=str, default=None, help="Job search location of the added keywords"
+    )
+    schedule_parser.add_argument(
+        "--state", type=str, default=SCHEDULE_STATE, help="Schedule state file"
+    )
+    schedule_parser.add_argument(
+        "--budget-hours",
+        type=float,
+        default=4.0,
+        help="Browser hours per 24 hours across all searches, 0 for no limit",
+    )
+    schedule_parser.add_argument(
+        "--target-new",
+        type=float,
+        default=10,
+        help="Recrawl a search once about this many new jobs are expected",
+    )
+    schedule_parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=15,
+        help="Minutes between crawls of the busiest searches",
+    )
+    schedule_parser.add_argument(
+        "--max-interval",
+        type=float,
+        default=7 * 24,
+        help="Hours between crawls of the quietest searches",
+    )
+    schedule_parser.add_argument(
+        "-p", type=int, default=None, help="Maximum pages per crawl"
+    )
+    schedule_parser.add_argument(
+        "--once", action="store_true", help="Crawl the searches that are due and exit"
+    )
+    schedule_parser.add_argument(
+        "--session",
+        type=str,
+        default=SESSION_STATE,
+        help="Login cookies kept between runs",
+    )
+    schedule_parser.set_defaults(func=schedule)
+
+    merge_parser = subparsers.add_parser(
+        "merge", help="Join main exports with their secondary exports"
+    )
+    merge_parser.add_argument(
+        "main",
+        type=str,
+        nargs="+",
+        help="Main csv exports or run manifests, oldest run first",
+    )
+    merge_parser.add_argument(
+        "-s",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Secondary exports, found next to each main export by default",
+    )
+    merge_parser.add_argument("-o", type=str, required=True, help="Output file")
+    merge_parser.add_argument(
+        "-f", type=str, choices=FORMATS, default=None, help="Output format"
+    )
+    merge_parser.add_argument(
+        "-d",
+        type=str,
+        default=DESCRIPTION_STORE,
+        help="Description store used when the secondary export holds hashes",
+    )
+    merge_parser.set_defaults(func=merge)
+
+    convert_parser = subparsers.add_parser(
+        "convert", help="Convert an export between csv and jsonl"
+    )
+    convert_parser.add_argument("src", type=str, help="Export to convert")
+    convert_parser.add_argument("-o", type=str, required=True, help="Output file")
+    convert_parser.add_argument(
+        "-f", type=str, choices=FORMATS, default=None, help="Output format"
+    )
+    convert_parser.set_defaults(func=convert)
+
+    stats_parser = subparsers.add_parser("stats", help="Summarize an export")
+    stats_parser.add_argument("path", type=str, help="Export to summarize")
+    stats_parser.set_defaults(func=stats)
+
+    simulate_parser = subparsers.add_parser(
+        "simulate", help="Serve a local JobStreet look-alike to test the scraper against"
+    )
+    simulate_parser.add_argument("--host", type=str, default="127.0.0.1")
+    simulate_parser.add_argument("--port", type=int, default=8765)
+    simulate_parser.add_argument(
+        "--jobs", type=int, default=200, help="Jobs listed for every search"
+    )
+    simulate_parser.add_argument(
+        "--per-page", type=int, default=30, help="Job cards per results page"
+    )
+    simulate_parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to every response"
+    )
+    simulate_parser.add_argument(
+        "--jitter", type=float, default=0.0, help="Random extra latency up to this many seconds"
+    )
+    simulate_parser.add_argument(
+        "--stale-rate",
+        type=float,
+        default=0.0,
+        help="Chance that opening a job re-renders the card list",
+    )
+    simulate_parser.add_argument(
+        "--throttle-rps",
+        type=float,
+        default=None,
+        help="Redirect to a challenge page above this many requests per second",
+    )
+    simulate_parser.add_argument(
+        "--otp",
+        type=otp_code,
+        default=DEFAULT_OTP,
+        help="The only OTP the sign in accepts",
+    )
+    simulate_parser.add_argument("--seed", type=int, default=0, help="Seed for job data")
+    simulate_parser.set_defaults(func=simulate)
+
+    args = parser.parse_args(argv)
+    if args.command == "schedule" and args.k and not args.l:
+        parser.error("schedule -k needs a location (-l)")
     return args
 
 
-def main():
-    init_logging()
-    args = cli()
-    keywords = [k.strip() for k in args.k.split(",") if k.strip()]
+def split_keywords(value: str) -> list[str]:
+    return [k.strip() for k in value.split(",") if k.strip()]
+
 
-    main_filename = create_timestamped_file("jobstreet_main", "csv")
-    sec_filename = create_timestamped_file("jobstreet_sec", "csv.gz")
-    header_written = False
+def create_scraper(args, **kwargs):
+    from jobscraper.scraper import JobScraper
 
-    scraper = JobScraper(email=args.e)
+    return JobScraper(
+        email=args.e,
+        governor=PolitenessGovernor(args.g),
+        tracer=CommandTracer(args.T) if args.T else None,
+        health=BrowserHealth(
+            slowdown=args.recycle_slowdown,
+            max_memory_mb=args.recycle_mb,
+            max_cards=args.recycle_cards,
+        ),
+        url=args.url,
+        otp=args.otp,
+        headless=args.headless,
+        **kwargs,
+    )
+
+
+def create_exporter(args, main_prefix, sec_prefix, directory=EXPORT_DIR):
+    return ShardedExporter(
+        main_prefix=main_prefix,
+        sec_prefix=sec_prefix,
+        directory=directory,
+        max_rows=args.shard_rows,
+        max_bytes=int(args.shard_mb * 1024 * 1024) if args.shard_mb else None,
+        max_seconds=args.shard_minutes * 60 if args.shard_minutes else None,
+        description_store=DescriptionStore(args.d) if args.d else None,
+        codec=Codec(args.codec, args.level),
+        compress_workers=args.compress_threads,
+        main_columns=CDC_CSV if args.cdc else MAIN_CSV,
+    )
+
+
+def close_exporter(exporter):
+    manifest = exporter.close()
+    print(f"Exported {exporter.total_rows} jobs, manifest: {manifest}")
+    if exporter.compression_stats.raw_bytes:
+        print(f"Compression {exporter.codec}: {exporter.compression_stats.summary()}")
+    description_store = exporter.description_store
+    if description_store is not None:
+        print(
+            f"Descriptions stored: {description_store.written} new, "
+            f"{description_store.reused} already known"
+        )
+        description_store.close()
+
+
+def scrape(args):
+    keywords = split_keywords(args.k)
+    exporter = create_exporter(args, "jobstreet_main", "jobstreet_sec")
+    tracker = ChangeTracker(args.cdc, exporter.run_id, args.l) if args.cdc else None
+
+    scraper = create_scraper(args, prefetch=args.prefetch)
     try:
         for batch in scraper.scrape_jobs(keywords=keywords, location=args.l):
-            main_csv, secondary_csv = export_to_csv(
-                batch,
-                main_filename=main_filename,
-                sec_filename=sec_filename,
-                header_written=header_written,
-            )
-            header_written = True
+            if tracker is not None:
+                batch = tracker.capture(batch)
+            main_csv, secondary_csv = exporter.write(batch)
+            if main_csv is None:
+                print("Nothing to export in this batch.")
+                continue
             print(f"Batch exported to: {main_csv}")
             if secondary_csv:
                 print(f"Secondary data exported to: {secondary_csv}")
@@ -44,6 +420,202 @@ def main():
     finally:
         scraper.close()
         print("Browser closed.")
+        if tracker is not None:
+            # an interrupted run or skipped cards mean not every listed job
+            # was seen, a keyword whose search failed was not seen at all
+            if args.tombstones and scraper.completed and not scraper.skipped_cards:
+                crawled = [k for k in keywords if k not in scraper.failed_keywords]
+                exporter.write(tracker.tombstones(crawled, (exporter.last_id or 0) + 1))
+            elif args.tombstones:
+                print("Run incomplete, no tombstones written.")
+            print(f"Changes: {tracker.summary()}")
+            tracker.close()
+        close_exporter(exporter)
+
+
+def coordinate(args):
+    queue = TaskQueue(args.q)
+    added = enqueue_search(queue, split_keywords(args.k), args.l)
+    print(f"Queued {added} new search tasks in {args.q}")
+
+    while args.w and not queue.is_drained():
+        requeued = queue.requeue_expired()
+        counts = queue.counts()
+        print(
+            f"pending {counts['pending']}, leased {counts['leased']}, "
+            f"done {counts['done']}, failed {counts['failed']}, requeued {requeued}"
+        )
+        time.sleep(30)
+
+    print(f"Task status: {queue.counts()}")
+
+
+def worker(args):
+    queue = TaskQueue(args.q)
+    name = args.n or default_worker_name()
+    exporter = create_exporter(
+        args, f"jobstreet_main_{name}", f"jobstreet_sec_{name}", args.o
+    )
+    tracker = ChangeTracker(args.cdc, exporter.run_id) if args.cdc else None
+
+    def sink(records):
+        if tracker is not None:
+            records = tracker.capture(records)
+        exporter.write(records)
+
+    scraper = create_scraper(args)
+    try:
+        scraper.start_session()
+        tasks_done = run_worker(
+            queue, scraper, sink, owner=name, lease=args.t, max_pages=args.p
+        )
+        print(f"Worker {name} finished {tasks_done} tasks")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        scraper.logger.error(f"Worker {name} stopped: {e}")
+    finally:
+        scraper.close()
+        print("Browser closed.")
+        if tracker is not None:
+            print(f"Changes: {tracker.summary()}")
+            tracker.close()
+        close_exporter(exporter)
+
+
+def print_schedule(scheduler):
+    for query in scheduler.summary():
+        rate = f"{query['rate']:.2f}/h" if query["rate"] is not None else "unknown"
+        interval = (
+            f"every {query['interval'] / 3600:.1f}h" if query["interval"] else "not crawled"
+        )
+        print(
+            f"  {query['keyword']} in {query['location']}: {rate} new jobs, {interval}, "
+            f"next {query['next_crawl']:%d-%m-%Y %H:%M}"
+        )
+
+
+def schedule(args):
+    scheduler = CrawlScheduler(
+        args.state,
+        budget_hours=args.budget_hours,
+        target_new=args.target_new,
+        min_interval=args.min_interval * 60,
+        max_interval=args.max_interval * 3600,
+    )
+    if args.k:
+        for keyword in split_keywords(args.k):
+            if scheduler.add_query(keyword, args.l):
+                print(f"Scheduled {keyword} in {args.l}")
+    scheduler.plan()
+    print("Schedule:")
+    print_schedule(scheduler)
+    # a cron run with nothing due does not start a browser
+    if args.once and not scheduler.due():
+        print("Nothing due.")
+        scheduler.close()
+        return
+
+    exporter = create_exporter(args, "jobstreet_main", "jobstreet_sec")
+    tracker = ChangeTracker(args.cdc, exporter.run_id) if args.cdc else None
+
+    def sink(records):
+        if tracker is not None:
+            records = tracker.capture(records)
+        exporter.write(records)
+
+    scraper = create_scraper(args)
+    try:
+        cookies = load_session(args.session)
+        if cookies and scraper.resume_session(cookies):
+            print("Resumed the saved login session.")
+        elif args.otp is None and not sys.stdin.isatty():
+            # e.g. from cron, nobody can type the OTP
+            raise Exception(
+                f"No valid login session in {args.session}, "
+                "run jobscraper schedule once from a terminal to sign in"
+            )
+        else:
+            scraper.start_session()
+        save_session(scraper.session_cookies, args.session)
+        crawls = run_schedule(scheduler, scraper, sink, max_pages=args.p, once=args.once)
+        print(f"Finished {crawls} crawls")
+    except KeyboardInterrupt:
+        print("Scheduler stopped.")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        scraper.logger.error(f"Scheduler stopped: {e}")
+    finally:
+        scraper.close()
+        print("Browser closed.")
+        if tracker is not None:
+            print(f"Changes: {tracker.summary()}")
+            tracker.close()
+        close_exporter(exporter)
+        print(f"Spent {scheduler.spent_seconds() / 3600:.2f} browser hours in the last 24h")
+        print_schedule(scheduler)
+        scheduler.close()
+
+
+def merge(args):
+    store = DescriptionStore(args.d) if os.path.exists(args.d) else None
+    try:
+        rows, duplicates = merge_exports(
+            expand_manifests(args.main), args.o, fmt=args.f, sec_paths=args.s, store=store
+        )
+    finally:
+        if store is not None:
+            store.close()
+    print(f"Merged {rows} jobs into {args.o}, dropped {duplicates} duplicates")
+
+
+def convert(args):
+    rows = convert_export(args.src, args.o, args.f)
+    print(f"Converted {rows} rows into {args.o}")
+
+
+def stats(args):
+    summary = export_stats(args.path)
+    print(f"Rows: {summary['rows']}")
+    if summary["posted_from"]:
+        print(f"Posted: {summary['posted_from']} to {summary['posted_to']}")
+    print("Keywords:")
+    for keyword, count in summary["keywords"].items():
+        print(f"  {keyword}: {count}")
+    print("Fill rate:")
+    for column, rate in summary["fill_rate"].items():
+        print(f"  {column}: {rate:.0%}")
+
+
+def simulate(args):
+    from jobscraper.simulator import JobStreetSimulator
+
+    simulator = JobStreetSimulator(
+        host=args.host,
+        port=args.port,
+        jobs_per_query=args.jobs,
+        per_page=args.per_page,
+        latency=args.latency,
+        jitter=args.jitter,
+        stale_rate=args.stale_rate,
+        throttle_rps=args.throttle_rps,
+        otp=args.otp,
+        seed=args.seed,
+    )
+    print(f"Simulating JobStreet on {simulator.url}, sign in with OTP {args.otp}")
+    print(f"Scrape it with: jobscraper scrape --url {simulator.url} --otp {args.otp} ...")
+    try:
+        simulator.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.server.server_close()
+        print(f"Served {simulator.requests} requests, throttled {simulator.throttled}")
+
+
+def main():
+    init_logging()
+    args = cli()
+    args.func(args)
 
 
 if __name__ == "__main__":
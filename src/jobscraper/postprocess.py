@@ -0,0 +1,219 @@
+from collections import Counter
+import csv
+import json
+import logging
+import os
+import sqlite3
+
+from jobscraper.compression import EXTENSIONS, open_text
+from jobscraper.exporter import MAIN_CSV, jobstreet_job_id
+
+logger = logging.getLogger(__name__.capitalize())
+
+FORMATS = ("csv", "jsonl")
+
+
+def open_export(path: str, mode: str = "rt"):
+    return open_text(path, mode)
+
+
+def read_rows(path: str):
+    with open_export(path) as f:
+        if ".jsonl" in path:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+
+def guess_format(path: str) -> str:
+    return "jsonl" if ".jsonl" in path else "csv"
+
+
+def write_rows(path: str, rows, fieldnames: list[str], fmt: str = None) -> int:
+    fmt = fmt or guess_format(path)
+    count = 0
+    with open_export(path, "wt") as f:
+        if fmt == "jsonl":
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                count += 1
+        else:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+    return count
+
+
+def secondary_path(main_path: str) -> str:
+    directory, name = os.path.split(main_path)
+    name = name.replace("jobstreet_main", "jobstreet_sec", 1)
+    base = os.path.join(directory, name)
+    for extension in (".gz", ".zst", ".lz4", ""):
+        if os.path.exists(base + extension):
+            return base + extension
+    return base + EXTENSIONS["gzip"]
+
+
+def expand_manifests(paths: list[str]) -> list[str]:
+    # a run manifest stands for every shard closed in that run
+    main_paths = []
+    for path in paths:
+        if not path.endswith("manifest.json"):
+            main_paths.append(path)
+            continue
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        directory = os.path.dirname(path)
+        for shard in manifest["shards"]:
+            main_paths.append(os.path.join(directory, shard["main"]["path"]))
+    return main_paths
+
+
+def _requirements(sec_path: str, store=None):
+    last_id = None
+    for row in read_rows(sec_path):
+        job_id = int(row["job_id"])
+        if last_id is not None and job_id <= last_id:
+            raise ValueError(f"{sec_path} is not in job_id order at {job_id}")
+        last_id = job_id
+
+        text = row.get("job_requirements")
+        if text is None and row.get("description_hash") and store is not None:
+            text = store.get(row["description_hash"])
+        yield job_id, text
+
+
+def join_export(main_path: str, sec_path: str = None, store=None):
+    # merge-join on id: export_to_csv writes both files in id order, so one
+    # pass with a single pending secondary row is enough
+    if sec_path and os.path.exists(sec_path):
+        requirements = _requirements(sec_path, store)
+    else:
+        logger.warning(f"No secondary export for {main_path}")
+        requirements = iter(())
+    pending = next(requirements, None)
+    last_id = None
+
+    for row in read_rows(main_path):
+        job_id = int(row["id"])
+        if last_id is not None and job_id <= last_id:
+            raise ValueError(f"{main_path} is not in id order at {job_id}")
+        last_id = job_id
+
+        while pending is not None and pending[0] < job_id:
+            logger.warning(f"Secondary row {pending[0]} has no main row")
+            pending = next(requirements, None)
+
+        row["job_requirements"] = None
+        if pending is not None and pending[0] == job_id:
+            row["job_requirements"] = pending[1]
+            pending = next(requirements, None)
+        yield row
+
+
+class SeenKeys:
+    # an anonymous on-disk SQLite database, memory stays bounded however
+    # many jobs are deduplicated
+    def __init__(self):
+        self.conn = sqlite3.connect("")
+        self.conn.execute("CREATE TABLE seen (key TEXT PRIMARY KEY)")
+
+    def add(self, key: str) -> bool:
+        cursor = self.conn.execute("INSERT OR IGNORE INTO seen VALUES (?)", (key,))
+        return cursor.rowcount == 1
+
+    def close(self):
+        self.conn.close()
+
+
+def merge_exports(
+    main_paths: list[str],
+    out_path: str,
+    fmt: str = None,
+    sec_paths: list[str] = None,
+    store=None,
+    dedupe: bool = None,
+):
+    sec_paths = sec_paths or [secondary_path(path) for path in main_paths]
+    if len(sec_paths) != len(main_paths):
+        raise ValueError("Every main export needs one secondary export")
+    if dedupe is None:
+        dedupe = len(main_paths) > 1
+
+    seen = SeenKeys() if dedupe else None
+    duplicates = 0
+
+    def joined():
+        nonlocal duplicates
+        # later runs come first so the newest copy of a job wins
+        for main_path, sec_path in reversed(list(zip(main_paths, sec_paths))):
+            for row in join_export(main_path, sec_path, store):
+                key = jobstreet_job_id(row.get("job_url")) or row.get("job_url")
+                if seen is not None and key and not seen.add(key):
+                    duplicates += 1
+                    continue
+                yield row
+
+    rows = joined()
+    first = next(rows, None)
+    # keep extra columns such as the change_type of change-data-capture runs
+    columns = list(first.keys()) if first is not None else MAIN_CSV + ["job_requirements"]
+
+    def all_rows():
+        if first is not None:
+            yield first
+            yield from rows
+
+    try:
+        written = write_rows(out_path, all_rows(), columns, fmt)
+    finally:
+        if seen is not None:
+            seen.close()
+    return written, duplicates
+
+
+def convert_export(src_path: str, out_path: str, fmt: str = None) -> int:
+    rows = read_rows(src_path)
+    first = next(rows, None)
+    if first is None:
+        return write_rows(out_path, [], [], fmt)
+
+    def all_rows():
+        yield first
+        yield from rows
+
+    return write_rows(out_path, all_rows(), list(first.keys()), fmt)
+
+
+def export_stats(path: str) -> dict:
+    total = 0
+    filled = Counter()
+    keywords = Counter()
+    posted_from = posted_to = None
+    columns = []
+    for row in read_rows(path):
+        if not columns:
+            columns = list(row.keys())
+        total += 1
+        for column, value in row.items():
+            if value not in (None, ""):
+                filled[column] += 1
+        if row.get("search_keyword"):
+            keywords[row["search_keyword"]] += 1
+        if row.get("job_posted_date"):
+            day, month, year = row["job_posted_date"].split("-")
+            posted = f"{year}-{month}-{day}"
+            posted_from = min(posted_from or posted, posted)
+            posted_to = max(posted_to or posted, posted)
+
+    return {
+        "rows": total,
+        "fill_rate": {c: filled[c] / total if total else 0 for c in columns},
+        "keywords": dict(keywords.most_common()),
+        "posted_from": posted_from,
+        "posted_to": posted_to,
+    }
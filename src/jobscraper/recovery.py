@@ -0,0 +1,32 @@
+from selenium.common.exceptions import WebDriverException
+
+# stale, intercepted, timeout and missing elements all derive from this
+RECOVERABLE_ERRORS = (WebDriverException,)
+
+# escalation order when a job card fails, cheapest first
+RECOVERY_STEPS = ("relocate", "reload", "restart")
+
+
+class RetryPolicy:
+    def __init__(self, attempts=1, delay=1.0, backoff=2.0, max_delay=10.0):
+        self.attempts = attempts
+        self.delay = delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+
+    def delay_for(self, attempt: int) -> float:
+        return min(self.delay * self.backoff ** (attempt - 1), self.max_delay)
+
+    def __repr__(self):
+        return (
+            f"RetryPolicy(attempts={self.attempts}, delay={self.delay}, "
+            f"backoff={self.backoff}, max_delay={self.max_delay})"
+        )
+
+
+def default_retry_policies():
+    return {
+        "relocate": RetryPolicy(attempts=2, delay=0.5),
+        "reload": RetryPolicy(attempts=2, delay=2.0),
+        "restart": RetryPolicy(attempts=1, delay=5.0),
+    }
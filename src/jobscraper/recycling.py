@@ -0,0 +1,89 @@
+from collections import deque
+import logging
+import statistics
+
+try:
+    import psutil
+except ImportError:  # memory tracking is skipped, latency trend still works
+    psutil = None
+
+logger = logging.getLogger(__name__.capitalize())
+
+
+def driver_memory_mb(driver):
+    # resident memory of the geckodriver process tree, firefox included
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root, *root.children(recursive=True)]
+        rss = 0
+        for process in processes:
+            try:
+                rss += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return rss / (1024 * 1024)
+    except (AttributeError, TypeError, psutil.Error) as e:
+        logger.debug(f"Could not read driver memory: {e}")
+        return None
+
+
+class BrowserHealth:
+    # Tracks per-card latency and browser memory for the current browser.
+    # The first `window` cards after a (re)start set the baseline; once the
+    # median of the last `window` cards is `slowdown` times slower, memory
+    # passes max_memory_mb or max_cards is reached, the browser should be
+    # replaced at the next page boundary.
+    def __init__(
+        self,
+        window: int = 30,
+        slowdown: float = 1.5,
+        max_memory_mb: float = 2048,
+        max_cards: int = None,
+    ):
+        self.window = window
+        self.slowdown = slowdown
+        self.max_memory_mb = max_memory_mb
+        self.max_cards = max_cards
+        self.recycles = 0
+        self.reset()
+
+    def reset(self):
+        self.cards = 0
+        self.baseline = None
+        self._first = []
+        self._recent = deque(maxlen=self.window)
+
+    def record_card(self, seconds: float):
+        self.cards += 1
+        self._recent.append(seconds)
+        if self.baseline is None:
+            self._first.append(seconds)
+            if len(self._first) >= self.window:
+                self.baseline = statistics.median(self._first)
+                self._first = []
+
+    @property
+    def recent_median(self):
+        return statistics.median(self._recent) if self._recent else None
+
+    def recycle_reason(self, memory_mb=None):
+        if self.max_cards is not None and self.cards >= self.max_cards:
+            return f"{self.cards} cards on this browser"
+        if (
+            memory_mb is not None
+            and self.max_memory_mb is not None
+            and memory_mb >= self.max_memory_mb
+        ):
+            return f"browser memory {memory_mb:.0f} MB"
+        if (
+            self.baseline
+            and len(self._recent) == self.window
+            and self.recent_median >= self.baseline * self.slowdown
+        ):
+            return (
+                f"card latency {self.recent_median:.2f}s vs "
+                f"{self.baseline:.2f}s baseline"
+            )
+        return None
@@ -0,0 +1,360 @@
+from datetime import datetime, timedelta
+import json
+import logging
+import os
+import sqlite3
+import time
+
+from jobscraper.exporter import EXPORT_DIR, jobstreet_job_id
+
+logger = logging.getLogger(__name__.capitalize())
+
+SCHEDULE_STATE = os.path.join(EXPORT_DIR, "schedule.sqlite3")
+SESSION_STATE = os.path.join(EXPORT_DIR, "session.json")
+
+POSTED_DATE_FORMAT = "%d-%m-%Y"
+# posted dates only have day precision, count postings over a week
+POSTED_WINDOW_DAYS = 7
+BUDGET_WINDOW = 24 * 3600
+DEFAULT_CRAWL_SECONDS = 120
+
+
+def posted_rate(records: list[dict], today=None) -> float:
+    # postings per hour over the last POSTED_WINDOW_DAYS, from job_posted_date
+    today = today or datetime.now().date()
+    since = today - timedelta(days=POSTED_WINDOW_DAYS - 1)
+    recent = 0
+    for job in records:
+        try:
+            posted = datetime.strptime(job.get("job_posted_date") or "", POSTED_DATE_FORMAT)
+        except ValueError:
+            continue
+        if posted.date() >= since:
+            recent += 1
+    return recent / (POSTED_WINDOW_DAYS * 24)
+
+
+def load_session(path: str = SESSION_STATE) -> list[dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def save_session(cookies: list[dict], path: str = SESSION_STATE):
+    # the cookies sign in as the user, only the owner may read them
+    dirname = os.path.dirname(path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(cookies, f)
+
+
+class CrawlScheduler:
+    # Keeps an observed posting rate (new jobs per hour) per keyword and
+    # location and plans each query's next crawl so that about target_new
+    # jobs have appeared since its last one. The first crawl estimates the
+    # rate from job_posted_date, later crawls from the jobs not seen before.
+    # When the planned crawls cost more than budget_hours of browser time
+    # per day, every interval is stretched by the same factor.
+    def __init__(
+        self,
+        path: str = SCHEDULE_STATE,
+        budget_hours: float = 4.0,
+        target_new: float = 10,
+        min_interval: float = 15 * 60,
+        max_interval: float = 7 * 24 * 3600,
+        smoothing: float = 0.5,
+        clock=time.time,
+    ):
+        self.path = path
+        self.budget_hours = budget_hours
+        self.target_new = target_new
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+        self.clock = clock
+        self.scale = 1.0
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS queries ("
+                "keyword TEXT NOT NULL, "
+                "location TEXT NOT NULL, "
+                "rate REAL, "
+                "crawl_seconds REAL, "
+                "crawls INTEGER NOT NULL DEFAULT 0, "
+                "last_crawl REAL, "
+                "interval REAL, "
+                "next_crawl REAL NOT NULL, "
+                "retry_after REAL, "
+                "PRIMARY KEY (keyword, location))"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS seen ("
+                "keyword TEXT NOT NULL, "
+                "location TEXT NOT NULL, "
+                "job_key TEXT NOT NULL, "
+                "PRIMARY KEY (keyword, location, job_key))"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS crawls ("
+                "keyword TEXT NOT NULL, "
+                "location TEXT NOT NULL, "
+                "started REAL NOT NULL, "
+                "seconds REAL NOT NULL, "
+                "jobs INTEGER NOT NULL, "
+                "new_jobs INTEGER NOT NULL)"
+            )
+
+    def add_query(self, keyword: str, location: str) -> bool:
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO queries (keyword, location, next_crawl) "
+                "VALUES (?, ?, ?)",
+                (keyword, location, self.clock()),
+            )
+        return cursor.rowcount == 1
+
+    def mark_seen(self, keyword: str, location: str, records: list[dict]) -> list[dict]:
+        # returns the records this query has not listed before
+        new = []
+        with self.conn:
+            for job in records:
+                key = jobstreet_job_id(job.get("job_url")) or job.get("job_url")
+                if not key:
+                    continue
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO seen (keyword, location, job_key) VALUES (?, ?, ?)",
+                    (keyword, location, key),
+                )
+                if cursor.rowcount == 1:
+                    new.append(job)
+        return new
+
+    def record_crawl(
+        self,
+        keyword: str,
+        location: str,
+        records: list[dict],
+        new_jobs: int,
+        started: float,
+        seconds: float,
+    ):
+        row = self.conn.execute(
+            "SELECT rate, crawl_seconds, last_crawl FROM queries "
+            "WHERE keyword = ? AND location = ?",
+            (keyword, location),
+        ).fetchone()
+        rate, crawl_seconds, last_crawl = row or (None, None, None)
+
+        if last_crawl is None:
+            observed = posted_rate(records)
+        else:
+            observed = new_jobs / max((started - last_crawl) / 3600, 1 / 60)
+        if rate is not None:
+            observed = self.smoothing * observed + (1 - self.smoothing) * rate
+        cost = seconds
+        if crawl_seconds is not None:
+            cost = self.smoothing * seconds + (1 - self.smoothing) * crawl_seconds
+
+        with self.conn:
+            self.conn.execute(
+                "UPDATE queries SET rate = ?, crawl_seconds = ?, crawls = crawls + 1, "
+                "last_crawl = ?, retry_after = NULL WHERE keyword = ? AND location = ?",
+                (observed, cost, started, keyword, location),
+            )
+            self.conn.execute(
+                "INSERT INTO crawls (keyword, location, started, seconds, jobs, new_jobs) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (keyword, location, started, seconds, len(records), new_jobs),
+            )
+        self.plan()
+        logger.info(
+            f"{keyword} in {location}: {len(records)} jobs, {new_jobs} new, "
+            f"{observed:.2f} new jobs per hour"
+        )
+
+    def postpone(self, keyword: str, location: str, seconds: float = None):
+        # a failed crawl is retried later without touching the planned rate
+        with self.conn:
+            self.conn.execute(
+                "UPDATE queries SET retry_after = ? WHERE keyword = ? AND location = ?",
+                (self.clock() + (seconds or self.min_interval), keyword, location),
+            )
+
+    def _interval(self, rate) -> float:
+        if not rate:
+            return self.max_interval
+        interval = self.target_new / rate * 3600
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def plan(self) -> float:
+        rows = self.conn.execute(
+            "SELECT keyword, location, rate, crawl_seconds, last_crawl FROM queries"
+        ).fetchall()
+        costs = [r[3] for r in rows if r[3] is not None]
+        default_cost = sorted(costs)[len(costs) // 2] if costs else DEFAULT_CRAWL_SECONDS
+
+        intervals = {(r[0], r[1]): self._interval(r[2]) for r in rows}
+        daily_seconds = sum(
+            (r[3] or default_cost) * BUDGET_WINDOW / intervals[(r[0], r[1])] for r in rows
+        )
+        budget_seconds = self.budget_hours * 3600
+        # the budget wins over max_interval
+        self.scale = max(1.0, daily_seconds / budget_seconds) if budget_seconds else 1.0
+
+        with self.conn:
+            for keyword, location, _, _, last_crawl in rows:
+                if last_crawl is None:
+                    continue
+                interval = intervals[(keyword, location)] * self.scale
+                self.conn.execute(
+                    "UPDATE queries SET interval = ?, next_crawl = ? "
+                    "WHERE keyword = ? AND location = ?",
+                    (interval, last_crawl + interval, keyword, location),
+                )
+        return self.scale
+
+    def spent_seconds(self, now: float = None) -> float:
+        now = self.clock() if now is None else now
+        row = self.conn.execute(
+            "SELECT COALESCE(SUM(seconds), 0) FROM crawls WHERE started > ?",
+            (now - BUDGET_WINDOW,),
+        ).fetchone()
+        return row[0]
+
+    def over_budget(self, now: float = None) -> bool:
+        # browser time spent over the last 24 hours, 0 hours means no budget
+        spent = self.spent_seconds(now)
+        return bool(self.budget_hours) and spent >= self.budget_hours * 3600
+
+    def due(self) -> list[tuple]:
+        now = self.clock()
+        if self.over_budget(now):
+            return []
+        # busiest queries first, their jobs go stale soonest
+        rows = self.conn.execute(
+            "SELECT keyword, location FROM queries "
+            "WHERE MAX(next_crawl, COALESCE(retry_after, 0)) <= ? "
+            "ORDER BY rate IS NULL DESC, rate DESC, next_crawl",
+            (now,),
+        ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def seconds_until_due(self) -> float:
+        now = self.clock()
+        row = self.conn.execute(
+            "SELECT MIN(MAX(next_crawl, COALESCE(retry_after, 0))) FROM queries"
+        ).fetchone()
+        if row[0] is None:
+            return None
+        wait = row[0] - now
+        if self.over_budget(now):
+            # wait until the oldest crawl of the window no longer counts
+            oldest = self.conn.execute(
+                "SELECT MIN(started) FROM crawls WHERE started > ?",
+                (now - BUDGET_WINDOW,),
+            ).fetchone()[0]
+            wait = max(wait, oldest + BUDGET_WINDOW - now)
+        return max(wait, 0)
+
+    def summary(self) -> list[dict]:
+        rows = self.conn.execute(
+            "SELECT keyword, location, rate, crawl_seconds, crawls, interval, next_crawl "
+            "FROM queries ORDER BY next_crawl"
+        ).fetchall()
+        return [
+            {
+                "keyword": keyword,
+                "location": location,
+                "rate": rate,
+                "crawl_seconds": crawl_seconds,
+                "crawls": crawls,
+                "interval": interval,
+                "next_crawl": datetime.fromtimestamp(next_crawl),
+            }
+            for keyword, location, rate, crawl_seconds, crawls, interval, next_crawl in rows
+        ]
+
+    def close(self):
+        self.conn.close()
+
+
+def crawl_query(
+    scheduler: CrawlScheduler,
+    scraper,
+    sink,
+    keyword: str,
+    location: str,
+    first_id: int = 1,
+    max_pages=None,
+):
+    # results are sorted by listed date, so once a page brings nothing new
+    # the older pages have been seen too
+    records = []
+    new_jobs = 0
+    page = 1
+    while True:
+        page_records, has_next = scraper.scrape_page(
+            keyword, location, page, first_id=first_id + len(records)
+        )
+        new = scheduler.mark_seen(keyword, location, page_records)
+        sink(page_records)
+        records.extend(page_records)
+        new_jobs += len(new)
+        if not has_next or not new or (max_pages is not None and page >= max_pages):
+            break
+        page += 1
+    return records, new_jobs
+
+
+def run_schedule(
+    scheduler: CrawlScheduler,
+    scraper,
+    sink,
+    max_pages=None,
+    once: bool = False,
+    max_wait: float = 15 * 60,
+    sleep=time.sleep,
+):
+    next_id = 1
+    crawls = 0
+    while True:
+        due = scheduler.due()
+        if not due:
+            wait = scheduler.seconds_until_due()
+            if once or wait is None:
+                break
+            print(f"Next crawl in {wait / 60:.0f} minutes")
+            sleep(min(wait, max_wait))
+            continue
+
+        for keyword, location in due:
+            if scheduler.over_budget():
+                break
+            started = scheduler.clock()
+            try:
+                records, new_jobs = crawl_query(
+                    scheduler, scraper, sink, keyword, location, next_id, max_pages
+                )
+            except Exception as e:
+                logger.error(f"Crawl of {keyword} in {location} failed: {e}")
+                scheduler.postpone(keyword, location)
+                continue
+            next_id += len(records)
+            scheduler.record_crawl(
+                keyword, location, records, new_jobs, started, scheduler.clock() - started
+            )
+            crawls += 1
+            print(f"Crawled {keyword} in {location}: {len(records)} jobs, {new_jobs} new")
+
+        if once:
+            break
+
+    return crawls
@@ -2,7 +2,13 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.by import By
-from jobscraper.configs import init_driver
+from jobscraper.configs import init_driver, is_valid_otp
+from jobscraper.recycling import driver_memory_mb
+from jobscraper.recovery import (
+    RECOVERABLE_ERRORS,
+    RECOVERY_STEPS,
+    default_retry_policies,
+)
 from selenium.common.exceptions import (
     StaleElementReferenceException,
     ElementClickInterceptedException,
@@ -10,23 +16,86 @@ from selenium.common.exceptions import (
     NoSuchElementException,
 )
 
+from contextlib import nullcontext
 from datetime import datetime, timedelta
+from urllib.parse import parse_qsl, quote, urlencode, urljoin, urlsplit, urlunsplit
 import logging
 import re
 import time
 
 
 class JobScraper:
-    def __init__(self, email: str):
+    def __init__(
+        self,
+        email: str,
+        retry_policies=None,
+        governor=None,
+        tracer=None,
+        health=None,
+        prefetch=False,
+        url="https://id.jobstreet.com/",
+        otp=None,
+        headless=False,
+    ):
+        if otp is not None and not is_valid_otp(otp):
+            raise ValueError(f"OTP must be 6 digits, got {otp!r}")
         self.logger = logging.getLogger(__name__)
-        self.driver = init_driver()
+        self.tracer = tracer
+        self.headless = headless
+        self.driver = init_driver(tracer=tracer, headless=headless)
         self.jobs_data = []
         self.email = email
-        self.url = "https://id.jobstreet.com/"
+        self.url = url if url.endswith("/") else url + "/"
+        # a fixed code skips the prompt, e.g. against the local simulator
+        self.otp = otp
         self.long_wait = 10
         self.short_wait = 5
+        self.retry_policies = retry_policies or default_retry_policies()
+        self.session_cookies = []
+        self.page_url = None
+        self.skipped_cards = []
+        # bumped whenever a recovery may have replaced the page's elements
+        self.dom_changes = 0
+        # time spent waiting for the governor, kept out of latency readings
+        self.pacing_wait = 0.0
+        self.card_seconds = None
+        self.governor = governor
+        self.health = health
+        self.prefetch = prefetch
+        self.completed = False
+        # keywords whose search or paging failed, their jobs were not all seen
+        self.failed_keywords = []
+        self.keyword_incomplete = False
+
+    def _phase(self, name, **labels):
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.phase(name, **labels)
+
+    def _pace(self):
+        if self.governor is not None:
+            self.pacing_wait += self.governor.acquire() or 0.0
+
+    def _signal(self, kind):
+        if self.governor is not None:
+            self.governor.record_signal(kind)
+
+    def _is_redirected(self):
+        try:
+            current = urlsplit(self.driver.current_url)
+        except RECOVERABLE_ERRORS:
+            return False
+        path = current.path.lower()
+        return current.netloc != urlsplit(self.url).netloc or any(
+            marker in path for marker in ("captcha", "challenge", "blocked")
+        )
+
+    def _navigate(self, url):
+        self._pace()
+        self.driver.get(url)
 
     def _click_element(self, element):
+        self._pace()
         try:
             self.driver.execute_script("arguments[0].click();", element)
             return True
@@ -34,7 +103,7 @@ class JobScraper:
             self.logger.warning(f"Element not clickable: {e}")
             return False
 
-    def _find_element_wait(self, by, value, condition=None):
+    def _find_element_wait(self, by, value, condition=None, signal="timeout"):
         if condition is None:
             condition = EC.presence_of_element_located((by, value))
         else:
@@ -44,8 +113,15 @@ class JobScraper:
             return WebDriverWait(self.driver, self.long_wait).until(condition)
         except TimeoutException:
             self.logger.error(f"Timeout finding element: {value}")
+            self._signal("redirect" if self._is_redirected() else signal)
             raise NoSuchElementException(f"Element not found: {value}")
 
+    def _incomplete(self, reason):
+        # the current keyword stops before its last page was scraped
+        self.logger.error(reason)
+        self.keyword_incomplete = True
+        return False
+
     def _clean_text(self, text):
         cleaned = re.sub(r"[\u2060\u200B-\u200F\uFEFF]", "", text)
         cleaned = cleaned.replace("–", "-").replace("—", "-")
@@ -64,10 +140,21 @@ class JobScraper:
             return datetime.now().strftime("%d-%m-%Y")
         else:
             match = re.search(r"\d+", text)
+            if match is None:
+                self.logger.warning(f"Unknown posted date: {date_text}")
+                return None
             days_ago = int(match.group())
             posted_date = datetime.now() - timedelta(days=days_ago)
             return posted_date.strftime("%d-%m-%Y")
 
+    def _parse_applied_link(self, url: str):
+        # the selected job is in the split view url as jobId
+        match = re.search(r"[?&]jobId=([^&#]+)", url or "")
+        if match is None:
+            self.logger.warning(f"No jobId in {url}, cannot construct apply link")
+            return None
+        return urljoin(self.url, f"id/job/{match.group(1)}/?ref=applied")
+
     def _login(self):
         try:
             sign_in = self._find_element_wait(
@@ -100,9 +187,12 @@ class JobScraper:
         max_attempts = 3
         attempts = 0
         while attempts < max_attempts:
-            otp = input("Enter OTP: ").strip()
-            if not otp.isdigit() or len(otp) != 6:
+            otp = (self.otp or input("Enter OTP: ")).strip()
+            if not is_valid_otp(otp):
                 print("Invalid OTP, enter 6-digit numeric")
+                if self.otp:
+                    # a fixed code would be rejected the same way every time
+                    attempts += 1
                 continue
 
             try:
@@ -118,18 +208,14 @@ class JobScraper:
                 otp_input.send_keys(digit)
                 time.sleep(0.2)
 
-            # wait for failed otp
+            # wait for failed otp; the alert is usually gone after a good
+            # code, so look without waiting and without a timeout signal
             time.sleep(2)
-            try:
-                error_alert = self._find_element_wait(
-                    By.CSS_SELECTOR, "[aria-live='polite']"
-                )
-                if "invalid code" in error_alert.text.strip().lower():
-                    print("Invalid OTP, please try again.")
-                    attempts += 1
-                    continue
-            except NoSuchElementException:
-                pass
+            error_alerts = self.driver.find_elements(By.CSS_SELECTOR, "[aria-live='polite']")
+            if error_alerts and "invalid code" in error_alerts[0].text.strip().lower():
+                print("Invalid OTP, please try again.")
+                attempts += 1
+                continue
 
             # wait until it redirects to home page
             self._find_element_wait(By.CSS_SELECTOR, "div[data-automation='homePage']")
@@ -256,13 +342,12 @@ class JobScraper:
                 EC.presence_of_all_elements_located,
             )
 
-            def get_idx(card):
-                job_id = card.get_attribute("id")
-                return int(job_id.split("-")[-1])
-
-            return sorted(job_cards, key=get_idx)
+            # ids are read once, they stay valid when the elements go stale
+            cards = [(card.get_attribute("id"), card) for card in job_cards]
+            return sorted(cards, key=lambda item: int(item[0].split("-")[-1]))
         except NoSuchElementException as e:
-            self.logger.error(f"Job cards not found: {e}")
+            # a loaded results page always lists cards
+            self._incomplete(f"Job cards not found: {e}")
             return []
 
     def _get_element_text(self, parent, selector, fallback=None):
@@ -348,7 +433,9 @@ class JobScraper:
             "company_benefits": None,
         }
         details = self._find_element_wait(
-            By.CSS_SELECTOR, "[data-automation='jobDetailsPage']"
+            By.CSS_SELECTOR,
+            "[data-automation='jobDetailsPage']",
+            signal="missing_details",
         )
         selectors = {
             "title": "h1[data-automation='job-detail-title']",
@@ -404,10 +491,10 @@ class JobScraper:
 
         if not apply_link:
             print("Apply link not found, already applied. Construct from url")
-            apply_link_id = self.driver.current_url.split("jobId=")[1].split("&")[0]
-            apply_link = f"https://id.jobstreet.com/id/job/{apply_link_id}/?ref=applied"
-            print(f"Constructed apply link: {apply_link}")
-            job_data["job_url"] = apply_link.split("?")[0]
+            apply_link = self._parse_applied_link(self.driver.current_url)
+            if apply_link:
+                print(f"Constructed apply link: {apply_link}")
+                job_data["job_url"] = apply_link.split("?")[0]
         else:
             job_data["job_url"] = apply_link.split("apply")[0]
 
@@ -418,6 +505,136 @@ class JobScraper:
 
         return job_data
 
+    def _remember_page(self):
+        # drop the selected jobId so a reload lands on the plain split view
+        parts = urlsplit(self.driver.current_url)
+        query = [(k, v) for k, v in parse_qsl(parts.query) if k != "jobId"]
+        self.page_url = urlunsplit(parts._replace(query=urlencode(query)))
+
+    def _locate_card(self, card_id):
+        return self._find_element_wait(By.ID, card_id)
+
+    def _reload_page(self):
+        self.logger.info(f"Reloading page {self.page_url}")
+        self._navigate(self.page_url)
+        if not self._wait_split_view_loaded():
+            raise NoSuchElementException(f"Page did not reload: {self.page_url}")
+
+    def _restart_driver(self, reload=True):
+        self.logger.warning("Restarting web driver")
+        try:
+            self.session_cookies = self.driver.get_cookies() or self.session_cookies
+        except RECOVERABLE_ERRORS:
+            self.logger.warning("Could not read cookies, reusing cookies from login")
+        try:
+            self.driver.quit()
+        except RECOVERABLE_ERRORS as e:
+            self.logger.warning(f"Error quitting wedged driver: {e}")
+
+        self.driver = init_driver(tracer=self.tracer, headless=self.headless)
+        self.dom_changes += 1
+        self._restore_cookies(self.session_cookies)
+        if self.health is not None:
+            self.health.reset()
+        if reload:
+            self._reload_page()
+
+    def _restore_cookies(self, cookies):
+        # cookies can only be set on the domain they belong to
+        self.driver.get(self.url)
+        for cookie in cookies:
+            try:
+                self.driver.add_cookie(cookie)
+            except RECOVERABLE_ERRORS as e:
+                self.logger.warning(f"Could not restore cookie {cookie.get('name')}: {e}")
+
+    def _maybe_recycle(self, reload=True):
+        # only called between pages, where nothing is half extracted
+        if self.health is None:
+            return False
+        reason = self.health.recycle_reason(driver_memory_mb(self.driver))
+        if reason is None:
+            return False
+        print(f"Recycling browser: {reason}")
+        self.logger.info(f"Recycling browser: {reason}")
+        self._restart_driver(reload=reload)
+        self.health.recycles += 1
+        return True
+
+    def _timed_extract(self, card):
+        # only the extraction itself, without governor waits or recovery steps
+        start = time.time()
+        paced = self.pacing_wait
+        job_details = self._extract_job_details(card)
+        self.card_seconds = time.time() - start - (self.pacing_wait - paced)
+        return job_details
+
+    def _extract_card(self, card, card_id):
+        self.card_seconds = None
+        try:
+            if card is None:
+                card = self._locate_card(card_id)
+            job_details = self._timed_extract(card)
+            if job_details is not None:
+                if self.governor is not None:
+                    self.governor.record_success(self.card_seconds)
+                return job_details
+            self.logger.warning(f"Failed to extract {card_id}, starting recovery")
+        except RECOVERABLE_ERRORS as e:
+            self.logger.warning(f"Failed to extract {card_id}, starting recovery: {e}")
+        except Exception as e:
+            # not a browser error, retrying would fail the same way
+            self.logger.exception(f"Unexpected error extracting {card_id}")
+            self._skip_card(card_id, e)
+            return None
+
+        if card_id is None or self.page_url is None:
+            self._skip_card(card_id, "card cannot be located again")
+            return None
+        return self._recover_card(card_id)
+
+    def _recover_card(self, card_id):
+        self.dom_changes += 1
+        prepare = {
+            "relocate": None,
+            "reload": self._reload_page,
+            "restart": self._restart_driver,
+        }
+        last_error = None
+        for step in RECOVERY_STEPS:
+            policy = self.retry_policies.get(step)
+            if policy is None:
+                continue
+            for attempt in range(1, policy.attempts + 1):
+                time.sleep(policy.delay_for(attempt))
+                try:
+                    if prepare[step] is not None:
+                        prepare[step]()
+                    card = self._locate_card(card_id)
+                    job_details = self._timed_extract(card)
+                except RECOVERABLE_ERRORS as e:
+                    last_error = e
+                    self.logger.warning(
+                        f"Recovery {step} {attempt}/{policy.attempts} for {card_id} failed: {e}"
+                    )
+                    continue
+                except Exception as e:
+                    self.logger.exception(f"Unexpected error recovering {card_id}")
+                    self._skip_card(card_id, e)
+                    return None
+                if job_details is not None:
+                    self.logger.info(f"Recovered {card_id} after {step}")
+                    return job_details
+                last_error = "element not clickable"
+
+        self._skip_card(card_id, last_error)
+        return None
+
+    def _skip_card(self, card_id, reason):
+        self.skipped_cards.append({"card_id": card_id, "page_url": self.page_url})
+        self.logger.error(f"Skipping {card_id} on {self.page_url}: {reason}")
+        print(f"Skipped job card {card_id}")
+
     def _next_page(self):
         try:
             next_btn = self._find_element_wait(
@@ -430,64 +647,174 @@ class JobScraper:
                 return False
 
         except NoSuchElementException:
-            self.logger.error("Failed to find next page button")
-            return False
+            return self._incomplete("Failed to find next page button")
 
         if not self._click_element(next_btn):
-            self.logger.error("Failed to click next page button")
-            return False
+            return self._incomplete("Failed to click next page button")
 
         if not self._wait_split_view_loaded():
-            self.logger.error("Next page did not load properly")
-            return False
+            return self._incomplete("Next page did not load properly")
 
         self.logger.info("Navigated to the next page")
         return True
 
-    def scrape_jobs(self, keywords: list[str], location: str):
+    def _start_prefetch(self):
+        # open the next results page in a background tab; the browser loads
+        # it while the cards of the current page are extracted
+        next_btns = self.driver.find_elements(
+            By.CSS_SELECTOR, "a[aria-label='Selanjutnya']"
+        )
+        if not next_btns or next_btns[0].get_attribute("aria-hidden") == "true":
+            return None
+        url = next_btns[0].get_attribute("href")
+        if not url:
+            return None
+
+        main_handle = self.driver.current_window_handle
+        self._pace()
+        self.driver.switch_to.new_window("tab")
+        # assigning location does not wait for the load like driver.get does
+        self.driver.execute_script("window.location.href = arguments[0];", url)
+        handle = self.driver.current_window_handle
+        self.driver.switch_to.window(main_handle)
+        self.logger.info(f"Prefetching next page {url}")
+        return {"handle": handle, "url": url}
+
+    def _finish_prefetch(self, prefetch):
         try:
-            start_scrape_time = time.time()
-            self.driver.get(self.url)
+            if prefetch["handle"] in self.driver.window_handles:
+                self.driver.close()
+                self.driver.switch_to.window(prefetch["handle"])
+                if self._wait_split_view_loaded():
+                    self.logger.info("Switched to the prefetched page")
+                    return True
+        except RECOVERABLE_ERRORS as e:
+            self.logger.warning(f"Prefetched page unusable: {e}")
+
+        # the tab is gone, e.g. after a driver restart, load the page here
+        self._navigate(prefetch["url"])
+        if not self._wait_split_view_loaded():
+            return self._incomplete("Next page did not load properly")
+        return True
+
+    def search_url(self, keyword: str, location: str, page: int = 1) -> str:
+        keyword_slug = quote("-".join(keyword.split()))
+        location_slug = quote("-".join(location.split()))
+        query = urlencode({"sortmode": "ListedDate", "page": page})
+        return urljoin(self.url, f"id/{keyword_slug}-jobs/in-{location_slug}?{query}")
+
+    def _has_next_page(self):
+        # the page is loaded, a single page of results has no pagination
+        next_btns = self.driver.find_elements(
+            By.CSS_SELECTOR, "a[aria-label='Selanjutnya']"
+        )
+        return bool(next_btns) and next_btns[0].get_attribute("aria-hidden") != "true"
+
+    def start_session(self):
+        with self._phase("login"):
+            self._navigate(self.url)
             self._find_element_wait(By.CSS_SELECTOR, "a[data-automation='sign in']")
 
             if not self._login():
                 self.logger.error("Login failed, cannot scrape jobs")
                 raise Exception("Login failed")
+            self.session_cookies = self.driver.get_cookies()
+        time.sleep(2)
+
+    def resume_session(self, cookies) -> bool:
+        # sign in with the cookies of an earlier session instead of an OTP
+        with self._phase("login"):
+            self._pace()
+            self._restore_cookies(cookies)
+            self._navigate(self.url)
+            try:
+                self._find_element_wait(By.CSS_SELECTOR, "div[data-automation='homePage']")
+            except NoSuchElementException:
+                return False
+            if self.driver.find_elements(By.CSS_SELECTOR, "a[data-automation='sign in']"):
+                self.logger.info("Saved session has expired")
+                return False
+            self.session_cookies = self.driver.get_cookies()
+        return True
 
-            time.sleep(2)
-            total_keywords = len(keywords)
+    def _scrape_page_cards(self, keyword: str, page_num: int, first_id: int):
+        with self._phase("page", keyword=keyword, page=page_num):
+            self._remember_page()
+            job_cards = self._find_job_cards()
+            dom_changes = self.dom_changes
+        next_id = first_id
+        for idx, (card_id, card) in enumerate(job_cards, start=1):
+            print(f"Processing job card {idx}/{len(job_cards)} on page {page_num}")
+            job_start_time = time.time()
+            job_info = {
+                "id": next_id,
+                "search_keyword": keyword,
+            }
+            if self.dom_changes != dom_changes:
+                # the listed elements belong to a reloaded or re-rendered page
+                card = None
+            with self._phase("page", keyword=keyword, page=page_num):
+                with self._phase("card", card=card_id):
+                    job_details = self._extract_card(card, card_id)
+            elapsed = time.time() - job_start_time
+            if job_details is None:
+                continue
+            if self.health is not None and self.card_seconds is not None:
+                self.health.record_card(self.card_seconds)
+            next_id += 1
+            print(f"Job card {idx} processed in {elapsed:.2f}s")
+            yield {**job_info, **job_details}
+
+    def scrape_page(self, keyword: str, location: str, page: int, first_id: int = 1):
+        url = self.search_url(keyword, location, page)
+        self._maybe_recycle(reload=False)
+        with self._phase("search", keyword=keyword, page=page):
+            self._navigate(url)
+            if not self._wait_split_view_loaded():
+                raise NoSuchElementException(f"Search page did not load: {url}")
+
+        records = list(self._scrape_page_cards(keyword, page, first_id))
+        with self._phase("paginate", keyword=keyword, page=page):
+            has_next = self._has_next_page()
+        return records, has_next
+
+    def scrape_jobs(self, keywords: list[str], location: str):
+        try:
+            start_scrape_time = time.time()
             total_jobs_scraped = 0
+            self.start_session()
+
+            total_keywords = len(keywords)
             batch = []
             for idx, keyword in enumerate(keywords, start=1):
                 print(
                     f"Searching with keyword {idx}/{total_keywords}: {keyword} in {location}"
                 )
-                job_count = self._search_jobs_keyword(
-                    keyword=keyword, location=location
-                )
+                self.keyword_incomplete = False
+                with self._phase("search", keyword=keyword):
+                    job_count = self._search_jobs_keyword(
+                        keyword=keyword, location=location
+                    )
                 if job_count == 0:
                     self.logger.warning(f"No jobs found for keyword: {keyword}")
+                    self.failed_keywords.append(keyword)
                     continue
 
                 page_num = 0
                 while True:
                     page_num += 1
-                    job_cards = self._find_job_cards()
-                    for idx, card in enumerate(job_cards, start=1):
-                        print(
-                            f"Processing job card {idx}/{len(job_cards)} on page {page_num}"
-                        )
-                        job_start_time = time.time()
-                        job_info = {
-                            "id": total_jobs_scraped + 1,
-                            "search_keyword": keyword,
-                        }
-                        job_details = self._extract_job_details(card)
-                        elapsed = time.time() - job_start_time
-                        job_record = {**job_info, **job_details}
+                    prefetch = None
+                    if self.prefetch:
+                        with self._phase("prefetch", keyword=keyword, page=page_num):
+                            try:
+                                prefetch = self._start_prefetch()
+                            except RECOVERABLE_ERRORS as e:
+                                self.logger.warning(f"Could not prefetch: {e}")
+                    for job_record in self._scrape_page_cards(
+                        keyword, page_num, total_jobs_scraped + 1
+                    ):
                         batch.append(job_record)
                         total_jobs_scraped += 1
-                        print(f"Job card {idx} processed in {elapsed:.2f}s")
 
                         if len(batch) >= 100:
                             yield batch
@@ -496,17 +823,37 @@ class JobScraper:
                     print(
                         f"Completed page {page_num}, total jobs: {total_jobs_scraped}"
                     )
-                    if not self._next_page():
+                    self._maybe_recycle()
+                    with self._phase("paginate", keyword=keyword, page=page_num):
+                        if prefetch is not None:
+                            has_next = self._finish_prefetch(prefetch)
+                        else:
+                            has_next = self._next_page()
+                    if not has_next:
                         print("No more pages to scrape.")
                         break
+                if self.keyword_incomplete:
+                    self.logger.warning(f"Stopped {keyword} before its last page")
+                    self.failed_keywords.append(keyword)
             if batch:
                 yield batch
+            self.completed = True
 
         except Exception as e:
             self.logger.error(f"Error during job scraping: {e}")
         finally:
             elapsed_time = time.time() - start_scrape_time
             print(f"Total jobs scraped: {total_jobs_scraped}, took {elapsed_time:.2f}s")
+            if self.skipped_cards:
+                print(f"Skipped job cards: {len(self.skipped_cards)}, see log")
+            if self.governor is not None:
+                print(f"Pacing: {self.governor.summary()}")
+            if self.tracer is not None:
+                print(self.tracer.summary())
+            if self.health is not None and self.health.recycles:
+                print(f"Browser recycled {self.health.recycles} times")
 
     def close(self):
         self.driver.quit()
+        if self.tracer is not None:
+            self.tracer.close()
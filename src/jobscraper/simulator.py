@@ -0,0 +1,450 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from html import escape
+from urllib.parse import parse_qs, unquote, urlencode, urlsplit
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+
+from jobscraper.configs import DEFAULT_OTP
+
+logger = logging.getLogger(__name__.capitalize())
+
+COMPANIES = [
+    {
+        "name": "PT Teknologi Nusantara",
+        "rating": "4.1",
+        "business_type": "Teknologi Informasi & Komunikasi",
+        "employees": "201-500 karyawan",
+        "benefits": ["Asuransi kesehatan", "Bonus tahunan", "Kerja hybrid"],
+    },
+    {
+        "name": "PT Bank Sejahtera Tbk",
+        "rating": "3.8",
+        "business_type": "Perbankan & Layanan Keuangan",
+        "employees": "1.001-5.000 karyawan",
+        "benefits": ["Asuransi kesehatan", "Tunjangan transportasi"],
+    },
+    {
+        "name": "CV Digital Kreatif",
+        "rating": None,
+        "business_type": None,
+        "employees": None,
+        "benefits": [],
+    },
+]
+
+LOCATIONS = ["Jakarta Selatan, Jakarta Raya", "Jakarta Barat, Jakarta Raya", "Tangerang, Banten"]
+CLASSIFICATIONS = ["Teknologi Informasi & Komunikasi", "Perbankan & Layanan Keuangan"]
+WORK_TYPES = ["Full time", "Kontrak", "Paruh waktu"]
+SALARIES = [None, "Rp 8.000.000 – Rp 12.000.000 per month", "Rp 15.000.000 – Rp 25.000.000 per month"]
+POSTED = ["Posted 5 jam yang lalu", "Posted 1 hari yang lalu", "Posted 3 hari yang lalu", "Posted 30+ hari yang lalu"]
+BOILERPLATE = (
+    "Kami adalah perusahaan yang berkembang pesat dan mencari talenta terbaik "
+    "untuk bergabung dengan tim kami. "
+)
+
+
+class SyntheticJobs:
+    # deterministic jobs per (keyword, location), the same query always
+    # yields the same listings so repeat crawls can be compared
+    def __init__(self, jobs_per_query: int = 200, seed: int = 0):
+        self.jobs_per_query = jobs_per_query
+        self.seed = seed
+        self._by_id = {}
+        self._lock = threading.Lock()
+
+    def _rng(self, *parts):
+        key = "|".join(str(p) for p in (self.seed, *parts))
+        return random.Random(hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+    def job(self, keyword: str, location: str, index: int) -> dict:
+        rng = self._rng(keyword.lower(), location.lower(), index)
+        company = rng.choice(COMPANIES)
+        title = f"{keyword.title()} {rng.choice(['Engineer', 'Specialist', 'Lead', 'Intern'])}"
+        job = {
+            "jobstreet_id": 80_000_000 + rng.randrange(10_000_000),
+            "title": title,
+            "company": company,
+            "location": rng.choice(LOCATIONS),
+            "classification": rng.choice(CLASSIFICATIONS),
+            "work_type": rng.choice(WORK_TYPES),
+            "salary": rng.choice(SALARIES),
+            "posted": rng.choice(POSTED),
+            "description": BOILERPLATE
+            + f"Posisi {title} di {company['name']}. "
+            + " ".join(f"Kualifikasi {i}: pengalaman {keyword}." for i in range(rng.randint(3, 12))),
+        }
+        with self._lock:
+            self._by_id[job["jobstreet_id"]] = job
+        return job
+
+    def page(self, keyword: str, location: str, page: int, per_page: int) -> list[dict]:
+        start = (page - 1) * per_page
+        end = min(start + per_page, self.jobs_per_query)
+        return [self.job(keyword, location, i) for i in range(start, end)]
+
+    def by_id(self, jobstreet_id: int):
+        with self._lock:
+            return self._by_id.get(jobstreet_id)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+PAGE = """<!DOCTYPE html>
+<html lang="id"><head><meta charset="utf-8"><title>{title}</title>
+<style>[role=menu][hidden]{{display:none}} article{{cursor:pointer;border:1px solid #ccc;margin:4px;padding:4px}}</style>
+</head><body>
+<header>{header}</header>
+<main>{body}</main>
+<script>{script}</script>
+</body></html>"""
+
+SEARCH_FORM = """<form id="search-form">
+<input id="keywords-input" name="keywords" value="{keyword}">
+<input id="SearchBar__Where" name="where" value="{location}">
+<button type="submit">Cari</button>
+</form>"""
+
+SEARCH_SCRIPT = """
+document.getElementById('search-form').addEventListener('submit', function (e) {
+  e.preventDefault();
+  var slug = function (v) { return v.trim().split(/\\s+/).map(encodeURIComponent).join('-'); };
+  var k = document.getElementById('keywords-input').value;
+  var w = document.getElementById('SearchBar__Where').value;
+  window.location.href = '/id/' + slug(k) + '-jobs/in-' + slug(w);
+});
+"""
+
+OTP_SCRIPT = """
+var input = document.querySelector("input[aria-label='verification input']");
+var alert = document.querySelector("[aria-live='polite']");
+input.addEventListener('input', function () {
+  if (input.value.length < 6) { return; }
+  fetch('/login/verify?otp=' + encodeURIComponent(input.value)).then(function (r) {
+    if (r.ok) { window.location.href = '/'; }
+    else { alert.textContent = 'Invalid code'; input.value = ''; }
+  });
+});
+"""
+
+RESULTS_SCRIPT = """
+var STALE_RATE = %(stale_rate)s;
+var trigger = document.querySelector("[data-automation='trigger']");
+trigger.addEventListener('click', function () {
+  document.querySelector("div[role='menu']").hidden = false;
+});
+function showJob(card) {
+  var pane = document.getElementById('split-view-detail');
+  pane.innerHTML = '';
+  var jobId = card.getAttribute('data-job-id');
+  var url = new URL(window.location.href);
+  url.searchParams.set('jobId', jobId);
+  history.replaceState(null, '', url.toString());
+  fetch('/api/jobs/' + jobId).then(function (r) {
+    if (!r.ok) { throw new Error('status ' + r.status); }
+    return r.text();
+  }).then(function (html) { pane.innerHTML = html; }).catch(function () {});
+  if (Math.random() < STALE_RATE) { setTimeout(rerender, 0); }
+}
+function bind(card) {
+  card.addEventListener('click', function () { showJob(card); });
+}
+function rerender() {
+  document.querySelectorAll("article[id^='jobcard-']").forEach(function (card) {
+    var fresh = card.cloneNode(true);
+    card.replaceWith(fresh);
+    bind(fresh);
+  });
+}
+document.querySelectorAll("article[id^='jobcard-']").forEach(bind);
+"""
+
+
+def _text(value):
+    return escape(value) if value else ""
+
+
+def render_job_details(job: dict, base_url: str) -> str:
+    company = job["company"]
+    rating = (
+        f'<span data-automation="company-review">{company["rating"]}</span>'
+        if company["rating"]
+        else ""
+    )
+    salary = (
+        f'<span data-automation="job-detail-salary">{_text(job["salary"])}</span>'
+        if job["salary"]
+        else ""
+    )
+    profile = ""
+    if company["business_type"]:
+        benefits = "".join(f"<span><div>{_text(b)}</div></span>" for b in company["benefits"])
+        profile = (
+            '<div data-automation="company-profile">'
+            "<div><section><h4>Profil perusahaan</h4></section>"
+            f'<section><div><span>{_text(company["business_type"])}</span>'
+            f'<span>{_text(company["employees"])}</span></div></section></div>'
+            f"<div><section><div><div>{benefits}</div></div></section></div>"
+            "</div>"
+        )
+    apply_link = f"{base_url}/id/job/{job['jobstreet_id']}/apply"
+    return (
+        '<div data-automation="jobDetailsPage">'
+        f'<h1 data-automation="job-detail-title">{_text(job["title"])}</h1>'
+        f'<span data-automation="advertiser-name">{_text(company["name"])}</span>'
+        f"{rating}"
+        f'<span data-automation="job-detail-location">{_text(job["location"])}</span>'
+        f'<span data-automation="job-detail-classifications">{_text(job["classification"])}</span>'
+        f'<span data-automation="job-detail-work-type">{_text(job["work_type"])}</span>'
+        f"{salary}"
+        f"<span>{_text(job['posted'])}</span>"
+        f'<a data-automation="job-detail-apply" href="{apply_link}">Lamar cepat</a>'
+        f'<div data-automation="jobAdDetails"><p>{_text(job["description"])}</p></div>'
+        f"{profile}"
+        "</div>"
+    )
+
+
+class JobStreetSimulator:
+    # A local stand-in for id.jobstreet.com that serves the data-automation
+    # markup JobScraper relies on: sign in with a fixed OTP, search results
+    # with jobcard-N articles, the split-view detail pane, company profile
+    # and Selanjutnya pagination. Latency, stale card re-renders and
+    # throttling can be injected to load-test the scraper.
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        jobs_per_query: int = 200,
+        per_page: int = 30,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        stale_rate: float = 0.0,
+        throttle_rps: float = None,
+        otp: str = DEFAULT_OTP,
+        seed: int = 0,
+    ):
+        self.jobs = SyntheticJobs(jobs_per_query, seed)
+        self.per_page = per_page
+        self.latency = latency
+        self.jitter = jitter
+        self.stale_rate = stale_rate
+        self.otp = otp
+        self.throttle = (
+            TokenBucket(throttle_rps, max(1.0, throttle_rps * 2)) if throttle_rps else None
+        )
+        self.requests = 0
+        self.throttled = 0
+        self._counter_lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def _handler_class(self):
+        simulator = self
+
+        class Handler(SimulatorHandler):
+            sim = simulator
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"JobStreet simulator listening on {self.url}")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def count_request(self, throttled: bool):
+        with self._counter_lock:
+            self.requests += 1
+            if throttled:
+                self.throttled += 1
+
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    sim = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    @property
+    def base_url(self):
+        return self.sim.url.rstrip("/")
+
+    def _logged_in(self):
+        return "session=simulated" in (self.headers.get("Cookie") or "")
+
+    def _send(self, status: int, body: str = "", headers: dict = None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _page(self, title, body, script="", keyword="", location=""):
+        header = SEARCH_FORM.format(keyword=_text(keyword), location=_text(location))
+        if not self._logged_in():
+            header = '<a data-automation="sign in" href="/login">Masuk</a>' + header
+        return PAGE.format(
+            title=escape(title), header=header, body=body, script=SEARCH_SCRIPT + script
+        )
+
+    def do_GET(self):
+        sim = self.sim
+        parts = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+
+        delay = sim.latency + (random.uniform(0, sim.jitter) if sim.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        throttled = (
+            sim.throttle is not None
+            and not parts.path.startswith("/challenge")
+            and not sim.throttle.take()
+        )
+        sim.count_request(throttled)
+        if throttled:
+            if parts.path.startswith("/api/"):
+                return self._send(429, "Too many requests")
+            target = "/challenge?" + urlencode({"next": self.path})
+            return self._send(302, headers={"Location": target})
+
+        route = parts.path
+        if route == "/":
+            return self._home()
+        if route == "/login":
+            return self._login()
+        if route == "/login/otp":
+            return self._otp(query.get("email", ""))
+        if route == "/login/verify":
+            return self._verify(query.get("otp", ""))
+        if route == "/challenge":
+            return self._send(429, self._page("Verifikasi", "<h1>Terlalu banyak permintaan</h1>"))
+
+        match = re.fullmatch(r"/api/jobs/(\d+)", route)
+        if match:
+            return self._job_details(int(match.group(1)))
+        match = re.fullmatch(r"/id/([^/]+)-jobs/in-([^/]+)", route)
+        if match:
+            keyword = unquote(match.group(1)).replace("-", " ")
+            location = unquote(match.group(2)).replace("-", " ")
+            return self._results(keyword, location, query)
+        match = re.fullmatch(r"/id/job/(\d+)/?(apply)?", route)
+        if match:
+            return self._send(200, self._page("Lowongan", f"<h1>Lowongan {match.group(1)}</h1>"))
+        return self._send(404, self._page("Tidak ditemukan", "<h1>404</h1>"))
+
+    def _home(self):
+        body = '<div data-automation="homePage"><h2>Temukan pekerjaan</h2></div>'
+        self._send(200, self._page("JobStreet", body))
+
+    def _login(self):
+        body = (
+            '<form action="/login/otp" method="get">'
+            '<input id="emailAddress" name="email" type="email">'
+            '<button type="submit">Lanjut</button></form>'
+        )
+        self._send(200, self._page("Masuk", body))
+
+    def _otp(self, email: str):
+        body = (
+            f"<p>Kode dikirim ke {_text(email)}</p>"
+            '<input aria-label="verification input" maxlength="6" inputmode="numeric">'
+            '<div aria-live="polite"></div>'
+        )
+        self._send(200, self._page("Verifikasi", body, OTP_SCRIPT))
+
+    def _verify(self, otp: str):
+        if otp != self.sim.otp:
+            return self._send(401, "invalid code")
+        self._send(
+            200, "ok", headers={"Set-Cookie": "session=simulated; Path=/; SameSite=Lax"}
+        )
+
+    def _job_details(self, jobstreet_id: int):
+        job = self.sim.jobs.by_id(jobstreet_id)
+        if job is None:
+            return self._send(404, "")
+        self._send(200, render_job_details(job, self.base_url))
+
+    def _results(self, keyword: str, location: str, query: dict):
+        sim = self.sim
+        page = max(1, int(query.get("page", "1") or 1))
+        total = sim.jobs.jobs_per_query
+        last_page = max(1, -(-total // sim.per_page))
+        jobs = sim.jobs.page(keyword, location, page, sim.per_page)
+
+        path = urlsplit(self.path).path
+        sort_link = path + "?" + urlencode({"sortmode": "ListedDate", "page": 1})
+        next_query = {"sortmode": query.get("sortmode", "ListedDate"), "page": page + 1}
+        next_hidden = "true" if page >= last_page else "false"
+
+        cards = "".join(
+            f'<article id="jobcard-{i}" data-job-id="{job["jobstreet_id"]}">'
+            f'<h3>{_text(job["title"])}</h3><span>{_text(job["company"]["name"])}</span>'
+            "</article>"
+            for i, job in enumerate(jobs, start=1)
+        )
+        selected = sim.jobs.by_id(int(query["jobId"])) if query.get("jobId", "").isdigit() else None
+        detail = (
+            render_job_details(selected, self.base_url)
+            if selected
+            else '<div data-automation="initialView"><h3>Pilih lowongan kerja</h3>'
+            "<p>Tampilkan detailnya di sini.</p></div>"
+        )
+        body = (
+            f'<div id="aria-search-bar"><span data-automation="totalJobsCount">{total:,}</span>'
+            f" lowongan {_text(keyword)} di {_text(location)}</div>"
+            '<div><span data-automation="trigger" role="button" tabindex="0">Urutkan</span>'
+            f'<div role="menu" hidden><a role="menuitem" data-automation="sortby-1" '
+            f'href="{escape(sort_link)}">Tanggal</a></div></div>'
+            f'<section id="results">{cards}</section>'
+            f'<section id="split-view-detail">{detail}</section>'
+            f'<nav><a aria-label="Selanjutnya" aria-hidden="{next_hidden}" '
+            f'href="{escape(path + "?" + urlencode(next_query))}">Selanjutnya</a></nav>'
+        )
+        script = RESULTS_SCRIPT % {"stale_rate": sim.stale_rate}
+        self._send(200, self._page(f"Lowongan {keyword}", body, script, keyword, location))
+
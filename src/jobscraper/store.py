@@ -0,0 +1,90 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import zlib
+
+from jobscraper.exporter import EXPORT_DIR
+
+logger = logging.getLogger(__name__.capitalize())
+
+DESCRIPTION_STORE = os.path.join(EXPORT_DIR, "descriptions.sqlite3")
+
+
+def normalize_description(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def description_hash(text: str) -> str:
+    normalized = normalize_description(text)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class DescriptionStore:
+    # job descriptions keyed by the sha256 of their normalized text, shared
+    # across runs so reposted jobs and boilerplate are only stored once
+    def __init__(self, path: str = DESCRIPTION_STORE):
+        self.path = path
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS descriptions "
+            "(hash TEXT PRIMARY KEY, body BLOB NOT NULL)"
+        )
+        self.conn.commit()
+        self._known = set()
+        self.written = 0
+        self.reused = 0
+
+    def __contains__(self, digest: str) -> bool:
+        if digest in self._known:
+            return True
+        row = self.conn.execute(
+            "SELECT 1 FROM descriptions WHERE hash = ?", (digest,)
+        ).fetchone()
+        if row:
+            self._known.add(digest)
+        return row is not None
+
+    def put(self, text: str) -> str:
+        digest = description_hash(text)
+        if digest in self:
+            self.reused += 1
+            return digest
+
+        body = zlib.compress(text.encode("utf-8"))
+        self.conn.execute(
+            "INSERT OR IGNORE INTO descriptions (hash, body) VALUES (?, ?)",
+            (digest, body),
+        )
+        self._known.add(digest)
+        self.written += 1
+        return digest
+
+    def put_many(self, texts) -> list[str]:
+        with self.conn:
+            return [self.put(text) for text in texts]
+
+    def get(self, digest: str):
+        row = self.conn.execute(
+            "SELECT body FROM descriptions WHERE hash = ?", (digest,)
+        ).fetchone()
+        if row is None:
+            return None
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+        logger.info(
+            f"Description store {self.path}: {self.written} written, {self.reused} reused"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
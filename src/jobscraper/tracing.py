@@ -0,0 +1,127 @@
+from collections import defaultdict
+from contextlib import contextmanager
+import json
+import logging
+import os
+import sys
+import time
+
+logger = logging.getLogger(__name__.capitalize())
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _call_site():
+    # first frame inside jobscraper that is not the tracer itself
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(PACKAGE_DIR) and filename != os.path.abspath(__file__):
+            return f"{os.path.basename(filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+class CommandBudgetExceeded(AssertionError):
+    pass
+
+
+class CommandTracer:
+    # Every WebDriver round trip, including WebElement calls, goes through
+    # driver.execute, so wrapping it on the driver instance sees them all.
+    # Each command is tagged with the current phase labels (phase, keyword,
+    # page, card) and optionally appended to a JSONL trace file.
+    def __init__(self, path: str = None):
+        self.path = path
+        self.count = 0
+        self.labels = {}
+        self.totals = defaultdict(lambda: {"commands": 0, "latency": 0.0})
+        self._file = open(path, "a", encoding="utf-8") if path else None
+
+    def install(self, driver):
+        original = driver.execute
+
+        def traced_execute(driver_command, params=None):
+            start = time.perf_counter()
+            try:
+                return original(driver_command, params)
+            finally:
+                self.record(driver_command, time.perf_counter() - start)
+
+        traced_execute.original = original
+        driver.execute = traced_execute
+        return driver
+
+    def uninstall(self, driver):
+        original = getattr(driver.execute, "original", None)
+        if original is not None:
+            driver.execute = original
+
+    def record(self, command: str, latency: float):
+        self.count += 1
+        totals = self.totals[self.labels.get("phase")]
+        totals["commands"] += 1
+        totals["latency"] += latency
+        if self._file is not None:
+            entry = {
+                "ts": time.time(),
+                "command": command,
+                "site": _call_site(),
+                "latency": round(latency, 6),
+                **self.labels,
+            }
+            self._file.write(json.dumps(entry) + "\n")
+
+    @contextmanager
+    def phase(self, name: str, **labels):
+        previous = self.labels
+        self.labels = {**previous, **labels, "phase": name}
+        try:
+            yield self
+        finally:
+            self.labels = previous
+
+    @contextmanager
+    def budget(self, limit: int, label: str = "code path"):
+        start = self.count
+        yield self
+        used = self.count - start
+        if used > limit:
+            raise CommandBudgetExceeded(
+                f"{label} issued {used} WebDriver commands, budget is {limit}"
+            )
+
+    def summary(self) -> str:
+        lines = [f"WebDriver commands: {self.count}"]
+        for phase, totals in sorted(self.totals.items(), key=lambda i: str(i[0])):
+            lines.append(
+                f"  {phase or 'other'}: {totals['commands']} commands, "
+                f"{totals['latency']:.2f}s"
+            )
+        return "\n".join(lines)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def summarize_trace(path: str) -> dict:
+    cards = defaultdict(lambda: {"commands": 0, "latency": 0.0})
+    pages = defaultdict(lambda: {"commands": 0, "latency": 0.0, "cards": set()})
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            page = (entry.get("keyword"), entry.get("page"))
+            if entry.get("page") is not None:
+                pages[page]["commands"] += 1
+                pages[page]["latency"] += entry["latency"]
+            if entry.get("card") is not None:
+                card = cards[(*page, entry["card"])]
+                card["commands"] += 1
+                card["latency"] += entry["latency"]
+                pages[page]["cards"].add(entry["card"])
+
+    for page in pages.values():
+        page["cards"] = len(page["cards"])
+    return {"cards": dict(cards), "pages": dict(pages)}
@@ -0,0 +1,50 @@
+from contextlib import contextmanager
+import pytest
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.locator_converter import LocatorConverter
+from selenium.webdriver.remote.webelement import WebElement
+from jobscraper.tracing import CommandBudgetExceeded, CommandTracer
+
+
+class StubDriver:
+    # answers WebDriver commands locally so real WebElement calls can be
+    # counted without a browser
+    def __init__(self, text="text", children=2):
+        self.text = text
+        self.children = children
+        self.locator_converter = LocatorConverter()
+
+    def execute(self, driver_command, params=None):
+        if driver_command == Command.FIND_CHILD_ELEMENT:
+            return {"value": WebElement(self, "child")}
+        if driver_command == Command.FIND_CHILD_ELEMENTS:
+            return {"value": [WebElement(self, f"child-{i}") for i in range(self.children)]}
+        if driver_command == Command.GET_ELEMENT_TEXT:
+            return {"value": self.text}
+        return {"value": None}
+
+    def execute_script(self, script, *args):
+        return self.execute(Command.W3C_EXECUTE_SCRIPT, {"script": script})["value"]
+
+
+@pytest.fixture
+def stub_driver():
+    return StubDriver()
+
+
+@pytest.fixture
+def command_budget():
+    # usage: with command_budget(driver, 5): code_under_test()
+    @contextmanager
+    def budget(driver, limit, label="code path"):
+        tracer = CommandTracer()
+        tracer.install(driver)
+        try:
+            with tracer.budget(limit, label):
+                yield tracer
+        except CommandBudgetExceeded as e:
+            pytest.fail(str(e))
+        finally:
+            tracer.uninstall(driver)
+
+    return budget
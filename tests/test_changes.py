@@ -0,0 +1,110 @@
+import pytest
+from jobscraper.changes import CDC_CSV, ChangeTracker
+from jobscraper.exporter import ShardedExporter
+from jobscraper.postprocess import read_rows
+
+
+def job(job_id, jobstreet_id, **fields):
+    return {
+        "id": job_id,
+        "search_keyword": "python",
+        "job_title": "Backend Engineer",
+        "job_url": f"https://id.jobstreet.com/id/job/{jobstreet_id}",
+        "job_salary_range": None,
+        "job_requirements": "Python, SQL",
+        **fields,
+    }
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "fingerprints.sqlite3")
+
+
+def run(store_path, run_id, batch, location="Jakarta Raya"):
+    tracker = ChangeTracker(store_path, run_id, location)
+    changes = tracker.capture(batch)
+    return tracker, changes
+
+
+@pytest.mark.unit
+class TestChangeTracker:
+    def test_first_run_inserts_everything(self, store_path):
+        tracker, changes = run(store_path, "1", [job(1, 11), job(2, 12)])
+
+        assert [c["change_type"] for c in changes] == ["insert", "insert"]
+        tracker.close()
+
+    def test_unchanged_jobs_are_dropped(self, store_path):
+        run(store_path, "1", [job(1, 11)])[0].close()
+
+        tracker, changes = run(
+            store_path, "2", [job(5, 11, search_keyword="backend", job_posted_date="x")]
+        )
+
+        assert changes == []
+        assert tracker.counts["unchanged"] == 1
+
+    def test_update_lists_changed_fields(self, store_path):
+        run(store_path, "1", [job(1, 11)])[0].close()
+
+        _, changes = run(
+            store_path,
+            "2",
+            [job(1, 11, job_salary_range="Rp 10 - 15 juta", job_requirements="Go")],
+        )
+
+        assert changes[0]["change_type"] == "update"
+        assert changes[0]["changed_fields"] == "job_salary_range; job_requirements"
+
+    def test_whitespace_only_description_edit_is_unchanged(self, store_path):
+        run(store_path, "1", [job(1, 11)])[0].close()
+
+        _, changes = run(store_path, "2", [job(1, 11, job_requirements=" Python,  SQL ")])
+
+        assert changes == []
+
+    def test_tombstones_for_jobs_no_longer_listed(self, store_path):
+        first_run = [job(1, 11), job(2, 12), job(3, 13, search_keyword="go")]
+        run(store_path, "1", first_run)[0].close()
+        tracker, _ = run(store_path, "2", [job(1, 11)])
+
+        deletes = tracker.tombstones(["python"], first_id=10)
+
+        assert deletes == [
+            {
+                "id": 10,
+                "search_keyword": "python",
+                "job_url": "https://id.jobstreet.com/id/job/12",
+                "change_type": "delete",
+                "changed_fields": None,
+            }
+        ]
+        assert tracker.tombstones(["python"]) == []
+
+    def test_tombstones_only_for_the_crawled_location(self, store_path):
+        run(store_path, "1", [job(1, 11)], location="Jakarta Raya")[0].close()
+        tracker, _ = run(store_path, "2", [job(1, 12)], location="Bandung")
+
+        assert tracker.tombstones(["python"]) == []
+
+    def test_relisted_job_is_inserted_again(self, store_path):
+        run(store_path, "1", [job(1, 11)])[0].close()
+        tracker, _ = run(store_path, "2", [])
+        tracker.tombstones(["python"])
+        tracker.close()
+
+        _, changes = run(store_path, "3", [job(1, 11)])
+
+        assert changes[0]["change_type"] == "insert"
+
+    def test_changes_exported_with_cdc_columns(self, store_path, tmp_path):
+        _, changes = run(store_path, "1", [job(1, 11)])
+        exporter = ShardedExporter(directory=str(tmp_path), main_columns=CDC_CSV)
+
+        exporter.write(changes)
+        exporter.close()
+
+        rows = list(read_rows(exporter.main_filename))
+        assert rows[0]["change_type"] == "insert"
+        assert list(rows[0].keys()) == CDC_CSV
@@ -0,0 +1,108 @@
+import threading
+import pytest
+from jobscraper.compression import Codec, CompressedWriter, open_text
+from jobscraper.exporter import ShardedExporter
+from jobscraper.postprocess import read_rows, secondary_path
+
+TEXT = "".join(f"line {i} with some repeated description text\n" for i in range(5000))
+
+
+def roundtrip(tmp_path, codec, workers):
+    path = str(tmp_path / f"out.txt{codec.extension}")
+    writer = CompressedWriter(path, codec, block_size=4096, workers=workers)
+    for start in range(0, len(TEXT), 1000):
+        writer.write(TEXT[start : start + 1000])
+    stats = writer.close()
+    with open_text(path) as f:
+        return f.read(), stats
+
+
+@pytest.mark.unit
+class TestCompressedWriter:
+    @pytest.mark.parametrize("workers", [1, 4])
+    @pytest.mark.parametrize("name", ["gzip", "none"])
+    def test_roundtrip_in_order(self, tmp_path, name, workers):
+        text, stats = roundtrip(tmp_path, Codec(name), workers)
+
+        assert text == TEXT
+        assert stats.raw_bytes == len(TEXT.encode("utf-8"))
+
+    @pytest.mark.parametrize("name,package", [("zstd", "zstandard"), ("lz4", "lz4")])
+    def test_optional_codecs(self, tmp_path, name, package):
+        pytest.importorskip(package)
+
+        text, stats = roundtrip(tmp_path, Codec(name), 4)
+
+        assert text == TEXT
+        assert stats.ratio > 1
+
+    def test_gzip_level_reported(self, tmp_path):
+        text, stats = roundtrip(tmp_path, Codec("gzip", 1), 1)
+
+        assert str(Codec("gzip", 1)) == "gzip-1"
+        assert stats.ratio > 1
+        assert "MB/s" in stats.summary()
+
+    def test_unknown_codec(self):
+        with pytest.raises(ValueError):
+            Codec("brotli")
+
+    @pytest.mark.parametrize("name,level", [("gzip", 10), ("gzip", -1), ("none", 3)])
+    def test_level_checked_up_front(self, name, level):
+        with pytest.raises(ValueError):
+            Codec(name, level)
+
+
+@pytest.mark.unit
+class TestShardedExporterCodecs:
+    @pytest.mark.parametrize("name", ["none", "gzip"])
+    def test_secondary_written_with_codec(self, tmp_path, name):
+        exporter = ShardedExporter(
+            directory=str(tmp_path), codec=Codec(name), compress_workers=2
+        )
+        exporter.write([{"id": 1, "job_requirements": "a"}, {"id": 2}])
+        exporter.write([{"id": 3, "job_requirements": "c"}])
+        exporter.close()
+
+        sec_file = secondary_path(exporter.main_filename)
+        assert sec_file.endswith(f"csv{Codec(name).extension}")
+        rows = list(read_rows(sec_file))
+        assert [(r["job_id"], r["job_requirements"]) for r in rows] == [
+            ("1", "a"),
+            ("3", "c"),
+        ]
+        assert exporter.compression_stats.raw_bytes > 0
+
+    def test_batch_on_disk_before_close(self, tmp_path):
+        exporter = ShardedExporter(directory=str(tmp_path), compress_workers=2)
+
+        exporter.write([{"id": 1, "job_requirements": "a"}])
+        exporter.sec_writer._pending[-1][0].result()
+        exporter.write([{"id": 2, "job_requirements": "b"}])
+
+        # readable as if the process had been killed right after the batch
+        rows = list(read_rows(exporter.sec_filename))
+        assert ("1", "a") in [(r["job_id"], r["job_requirements"]) for r in rows]
+        exporter.close()
+
+    def test_flush_does_not_wait_for_compression(self, tmp_path):
+        release = threading.Event()
+        codec = Codec("gzip")
+        compress = codec.compress
+        codec.compress = lambda data: release.wait(5) and compress(data)
+        path = str(tmp_path / "out.txt.gz")
+        writer = CompressedWriter(path, codec, workers=2)
+
+        writer.write("first\n")
+        writer.flush()
+
+        assert writer.stats.raw_bytes == 0
+        release.set()
+        writer._pending[0][0].result()
+        writer.write("second\n")
+        writer.flush()
+        with open_text(path) as f:
+            assert f.read().startswith("first\n")
+        writer.close()
+        with open_text(path) as f:
+            assert f.read() == "first\nsecond\n"
@@ -0,0 +1,119 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from jobscraper.distributed import TASK_ID_SPAN, TaskQueue, enqueue_search, run_worker
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return TaskQueue(str(tmp_path / "tasks.sqlite3"), max_attempts=2)
+
+
+@pytest.fixture
+def heartbeat():
+    with patch("jobscraper.distributed.Heartbeat") as heartbeat_class:
+        heartbeat = heartbeat_class.return_value.__enter__.return_value
+        heartbeat.lost = False
+        yield heartbeat
+
+
+@pytest.mark.unit
+class TestTaskQueue:
+    def test_add_is_idempotent(self, queue):
+        assert queue.add("python", "Jakarta Raya", 1) is True
+        assert queue.add("python", "Jakarta Raya", 1) is False
+        assert queue.counts()["pending"] == 1
+
+    def test_claim_leases_task_once(self, queue):
+        queue.add("python", "Jakarta Raya", 1)
+
+        task = queue.claim("worker-a", lease=60)
+
+        assert (task.keyword, task.location, task.page) == ("python", "Jakarta Raya", 1)
+        assert queue.claim("worker-b", lease=60) is None
+        assert queue.counts()["leased"] == 1
+
+    def test_expired_lease_is_requeued(self, queue):
+        queue.add("python", "Jakarta Raya", 1)
+        task = queue.claim("worker-a", lease=-1)
+
+        reclaimed = queue.claim("worker-b", lease=60)
+
+        assert reclaimed.id == task.id
+        assert reclaimed.attempts == 2
+        assert queue.complete(task.id, "worker-a") is False
+        assert queue.complete(task.id, "worker-b") is True
+
+    def test_heartbeat_extends_only_own_lease(self, queue):
+        queue.add("python", "Jakarta Raya", 1)
+        task = queue.claim("worker-a", lease=60)
+
+        assert queue.heartbeat(task.id, "worker-a", lease=60) is True
+        assert queue.heartbeat(task.id, "worker-b", lease=60) is False
+
+    def test_fail_gives_up_after_max_attempts(self, queue):
+        queue.add("python", "Jakarta Raya", 1)
+        for _ in range(2):
+            task = queue.claim("worker-a", lease=60)
+            queue.fail(task.id, "worker-a", "boom")
+
+        assert queue.counts()["failed"] == 1
+        assert queue.is_drained()
+
+
+@pytest.mark.unit
+class TestRunWorker:
+    def test_worker_follows_pages_and_sinks_records(self, queue, heartbeat):
+        enqueue_search(queue, ["python", "data"], "Jakarta Raya")
+        scraper = MagicMock()
+        scraper.scrape_page.side_effect = lambda keyword, location, page, first_id: (
+            [{"id": first_id, "search_keyword": keyword}],
+            page < 2,
+        )
+        sink = MagicMock()
+
+        done = run_worker(queue, scraper, sink, owner="worker-a")
+
+        assert done == 4
+        assert queue.counts()["done"] == 4
+        ids = [call.args[0][0]["id"] for call in sink.call_args_list]
+        # task ids: python 1, data 2, their second pages 3 and 4
+        assert ids == [task_id * TASK_ID_SPAN for task_id in (1, 2, 3, 4)]
+
+    def test_worker_respects_max_pages(self, queue, heartbeat):
+        enqueue_search(queue, ["python"], "Jakarta Raya")
+        scraper = MagicMock()
+        scraper.scrape_page.return_value = ([], True)
+
+        done = run_worker(queue, scraper, MagicMock(), owner="a", max_pages=3)
+
+        assert done == 3
+
+    def test_failed_task_is_retried(self, queue, heartbeat):
+        enqueue_search(queue, ["python"], "Jakarta Raya")
+        scraper = MagicMock()
+        scraper.scrape_page.side_effect = [Exception("wedged"), ([], False)]
+
+        done = run_worker(queue, scraper, MagicMock(), owner="a")
+
+        assert done == 1
+        assert queue.counts()["done"] == 1
+
+    def test_task_handed_on_is_not_exported(self, queue, heartbeat):
+        enqueue_search(queue, ["python"], "Jakarta Raya")
+        scraper = MagicMock()
+
+        def scrape_page(keyword, location, page, first_id):
+            # the lease expires mid-page and another worker does the task
+            queue.fail(1, "a", "lease expired")
+            queue.claim("b", 300)
+            queue.complete(1, "b")
+            return [{"id": first_id}], True
+
+        scraper.scrape_page.side_effect = scrape_page
+        sink = MagicMock()
+
+        done = run_worker(queue, scraper, sink, owner="a")
+
+        assert done == 0
+        sink.assert_not_called()
+        assert queue.counts()["pending"] == 0
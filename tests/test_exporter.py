@@ -0,0 +1,103 @@
+import csv
+import json
+import os
+import pytest
+from unittest.mock import patch
+from jobscraper.exporter import ShardedExporter, file_digest
+from jobscraper.postprocess import expand_manifests, read_rows
+
+
+def jobs(first_id, count):
+    return [
+        {"id": i, "job_title": f"job {i}", "job_requirements": f"req {i}" if i % 2 else None}
+        for i in range(first_id, first_id + count)
+    ]
+
+
+def load_manifest(exporter):
+    with open(exporter.manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.mark.unit
+class TestShardedExporter:
+    def test_unsharded_run_keeps_single_file_names(self, tmp_path):
+        exporter = ShardedExporter(directory=str(tmp_path))
+
+        exporter.write(jobs(1, 3))
+        exporter.close()
+
+        manifest = load_manifest(exporter)
+        assert manifest["complete"] is True
+        assert len(manifest["shards"]) == 1
+        shard = manifest["shards"][0]
+        assert shard["main"]["path"] == f"jobstreet_main_{exporter.run_id}.csv"
+        assert (shard["main"]["rows"], shard["secondary"]["rows"]) == (3, 2)
+
+    def test_rotate_by_rows_splits_batches(self, tmp_path):
+        exporter = ShardedExporter(directory=str(tmp_path), max_rows=4)
+
+        exporter.write(jobs(1, 3))
+        exporter.write(jobs(4, 3))
+        exporter.close()
+
+        shards = load_manifest(exporter)["shards"]
+        assert [(s["first_id"], s["last_id"], s["main"]["rows"]) for s in shards] == [
+            (1, 4, 4),
+            (5, 6, 2),
+        ]
+        first = os.path.join(str(tmp_path), shards[0]["main"]["path"])
+        assert first.endswith("_00001.csv")
+        with open(first, newline="", encoding="utf-8") as f:
+            assert [row["id"] for row in csv.DictReader(f)] == ["1", "2", "3", "4"]
+        assert shards[0]["main"]["sha256"] == file_digest(first)
+
+    def test_write_returns_the_shard_written(self, tmp_path):
+        exporter = ShardedExporter(directory=str(tmp_path), max_rows=3)
+
+        main_csv, sec_csv = exporter.write(jobs(1, 3))
+
+        assert main_csv.endswith("_00001.csv") and os.path.exists(main_csv)
+        assert sec_csv.endswith("_00001.csv.gz") and os.path.exists(sec_csv)
+        assert exporter.main_filename.endswith("_00002.csv")
+        assert exporter.write([]) == (None, None)
+        exporter.close()
+
+    def test_closed_shards_listed_while_running(self, tmp_path):
+        exporter = ShardedExporter(directory=str(tmp_path), max_rows=2)
+
+        exporter.write(jobs(1, 3))
+
+        manifest = load_manifest(exporter)
+        assert manifest["complete"] is False
+        assert [s["shard"] for s in manifest["shards"]] == [1]
+
+    def test_rotate_by_bytes(self, tmp_path):
+        exporter = ShardedExporter(directory=str(tmp_path), max_bytes=1)
+
+        exporter.write(jobs(1, 1))
+        exporter.write(jobs(2, 1))
+        exporter.close()
+
+        assert len(load_manifest(exporter)["shards"]) == 2
+
+    def test_rotate_by_time(self, tmp_path):
+        with patch("jobscraper.exporter.time.time", return_value=1000.0):
+            exporter = ShardedExporter(directory=str(tmp_path), max_seconds=60)
+            exporter.write(jobs(1, 1))
+        with patch("jobscraper.exporter.time.time", return_value=1061.0):
+            exporter.write(jobs(2, 1))
+        exporter.close()
+
+        assert len(load_manifest(exporter)["shards"]) == 2
+
+    def test_manifest_expands_to_shards(self, tmp_path):
+        exporter = ShardedExporter(directory=str(tmp_path), max_rows=2)
+        exporter.write(jobs(1, 5))
+        exporter.close()
+
+        main_paths = expand_manifests([exporter.manifest_path])
+
+        assert len(main_paths) == 3
+        ids = [row["id"] for path in main_paths for row in read_rows(path)]
+        assert ids == ["1", "2", "3", "4", "5"]
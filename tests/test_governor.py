@@ -0,0 +1,55 @@
+import pytest
+from unittest.mock import MagicMock
+from jobscraper.governor import PolitenessGovernor
+
+
+@pytest.fixture
+def governor(tmp_path):
+    return PolitenessGovernor(
+        state_path=str(tmp_path / "governor.json"),
+        initial_rate=1.0,
+        sleep=MagicMock(),
+    )
+
+
+@pytest.mark.unit
+class TestPolitenessGovernor:
+    def test_success_increases_rate_additively(self, governor):
+        governor.record_success(1.0)
+        governor.record_success(1.0)
+
+        assert governor.rate == pytest.approx(1.1)
+
+    def test_signal_decreases_rate_multiplicatively(self, governor):
+        governor.record_signal("timeout")
+
+        assert governor.rate == pytest.approx(0.5)
+        assert governor.signals == {"timeout": 1}
+
+    def test_rate_bounded(self, governor):
+        for _ in range(20):
+            governor.record_signal("timeout")
+
+        assert governor.rate == pytest.approx(governor.min_rate)
+
+    def test_slow_responses_back_off(self, governor):
+        governor.record_success(governor.latency_target * 2)
+
+        assert governor.rate == pytest.approx(0.5)
+        assert governor.signals == {"slow": 1}
+
+    def test_acquire_spaces_requests(self, governor):
+        assert governor.acquire() == 0
+        wait = governor.acquire()
+
+        assert 0.9 < wait <= 1.0
+        governor.sleep.assert_called_once()
+
+    def test_budget_shared_through_state_file(self, governor):
+        other = PolitenessGovernor(state_path=governor.state_path, sleep=MagicMock())
+
+        governor.record_signal("redirect")
+        governor.acquire()
+
+        assert other.rate == pytest.approx(0.5)
+        assert other.acquire() > 1.9
@@ -0,0 +1,192 @@
+import csv
+import gzip
+import json
+import os
+import subprocess
+import sys
+import pytest
+from unittest.mock import MagicMock, patch
+from jobscraper.main import cli, main
+
+
+@pytest.fixture
+def exports(tmp_path):
+    main_file = tmp_path / "jobstreet_main_20240101_000000.csv"
+    sec_file = tmp_path / "jobstreet_sec_20240101_000000.csv.gz"
+    main_file.write_text(
+        "id,search_keyword,job_title,job_posted_date\n"
+        "1,python,Backend,01-02-2024\n"
+        "2,data,Analyst,\n",
+        encoding="utf-8",
+    )
+    with gzip.open(sec_file, "wt", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["job_id", "job_requirements"])
+        writer.writerow(["1", "Python, SQL"])
+    return main_file, sec_file
+
+
+@pytest.mark.unit
+class TestCli:
+    def test_plain_flags_mean_scrape(self):
+        args = cli(["-e", "a@b.c", "-k", "python", "-l", "Jakarta Raya"])
+
+        assert args.command == "scrape"
+        assert (args.e, args.k, args.l) == ("a@b.c", "python", "Jakarta Raya")
+
+    def test_otp_must_be_six_digits(self, capsys):
+        with pytest.raises(SystemExit):
+            cli(["-e", "a@b.c", "-k", "python", "-l", "Jakarta", "--otp", "12345"])
+
+        assert "OTP must be 6 digits" in capsys.readouterr().err
+
+    def test_offline_commands_do_not_import_selenium(self, exports):
+        main_file, _ = exports
+        code = (
+            "import sys; sys.argv = ['jobscraper', 'stats', sys.argv[1]]; "
+            "from jobscraper.main import main; main(); "
+            "assert not any(m.startswith('selenium') for m in sys.modules); "
+            "assert 'http.server' not in sys.modules"
+        )
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+
+        result = subprocess.run(
+            [sys.executable, "-c", code, str(main_file)],
+            cwd=main_file.parent,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert "Rows: 2" in result.stdout
+
+
+@pytest.mark.unit
+class TestOfflineCommands:
+    def test_merge(self, exports, tmp_path, monkeypatch):
+        main_file, sec_file = exports
+        out = tmp_path / "joined.jsonl"
+        monkeypatch.chdir(tmp_path)
+        argv = ["jobscraper", "merge", str(main_file), "-s", str(sec_file), "-o", str(out)]
+        monkeypatch.setattr(sys, "argv", argv)
+
+        main()
+
+        rows = [json.loads(line) for line in out.read_text().splitlines()]
+        assert [r["job_requirements"] for r in rows] == ["Python, SQL", None]
+
+    def test_convert_and_stats(self, exports, tmp_path, monkeypatch, capsys):
+        main_file, _ = exports
+        out = tmp_path / "jobs.jsonl"
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(
+            sys, "argv", ["jobscraper", "convert", str(main_file), "-o", str(out)]
+        )
+        main()
+        monkeypatch.setattr(sys, "argv", ["jobscraper", "stats", str(out)])
+        main()
+
+        output = capsys.readouterr().out
+        assert "Converted 2 rows" in output
+        assert "Posted: 2024-02-01 to 2024-02-01" in output
+        assert "job_posted_date: 50%" in output
+
+
+@pytest.mark.unit
+class TestScrapeTombstones:
+    @pytest.fixture
+    def known_job(self, tmp_path, monkeypatch):
+        from jobscraper.changes import ChangeTracker
+
+        monkeypatch.chdir(tmp_path)
+        tracker = ChangeTracker("fingerprints.sqlite3", "1", "Jakarta Raya")
+        tracker.capture(
+            [{"search_keyword": "python", "job_url": "https://id.jobstreet.com/id/job/11"}]
+        )
+        tracker.close()
+
+    def scrape(self, monkeypatch, capsys, skipped_cards=(), failed_keywords=(), scraper=None):
+        if scraper is None:
+            scraper = MagicMock(
+                completed=True,
+                skipped_cards=list(skipped_cards),
+                failed_keywords=list(failed_keywords),
+            )
+            scraper.scrape_jobs.return_value = []
+        monkeypatch.setattr("jobscraper.main.create_scraper", lambda *a, **k: scraper)
+        argv = ["jobscraper", "-e", "a@b.c", "-k", "python", "-l", "Jakarta Raya"]
+        argv += ["--cdc", "fingerprints.sqlite3", "--tombstones"]
+        monkeypatch.setattr(sys, "argv", argv)
+        main()
+        return capsys.readouterr().out
+
+    def test_completed_run_writes_tombstones(self, known_job, monkeypatch, capsys):
+        assert "1 delete" in self.scrape(monkeypatch, capsys)
+
+    def test_skipped_cards_prevent_tombstones(self, known_job, monkeypatch, capsys):
+        output = self.scrape(monkeypatch, capsys, skipped_cards=[{"card_id": "jobcard-3"}])
+
+        assert "0 delete" in output
+        assert "no tombstones written" in output
+
+    def test_failed_search_keyword_is_not_tombstoned(self, known_job, monkeypatch, capsys):
+        assert "0 delete" in self.scrape(monkeypatch, capsys, failed_keywords=["python"])
+
+    def test_failed_next_page_is_not_tombstoned(self, known_job, monkeypatch, capsys):
+        from jobscraper.scraper import JobScraper
+
+        with patch("jobscraper.scraper.init_driver", return_value=MagicMock()):
+            scraper = JobScraper(email="a@b.c")
+        scraper.start_session = MagicMock()
+        scraper._search_jobs_keyword = MagicMock(return_value=60)
+        scraper._remember_page = MagicMock()
+        scraper._find_job_cards = MagicMock(return_value=[("jobcard-1", MagicMock())])
+        scraper._extract_card = MagicMock(
+            return_value={"job_url": "https://id.jobstreet.com/id/job/12"}
+        )
+        next_btn = MagicMock()
+        next_btn.get_attribute.return_value = "false"
+        scraper._find_element_wait = MagicMock(return_value=next_btn)
+        scraper._click_element = MagicMock(return_value=True)
+        # page 2 exists but never loads, job 11 may still be listed there
+        scraper._wait_split_view_loaded = MagicMock(return_value=False)
+
+        output = self.scrape(monkeypatch, capsys, scraper=scraper)
+
+        assert scraper.completed is True
+        assert scraper.failed_keywords == ["python"]
+        assert "0 delete" in output
+
+
+@pytest.mark.unit
+class TestScheduleSession:
+    def schedule(self, tmp_path, monkeypatch, scraper):
+        monkeypatch.setattr("jobscraper.main.create_scraper", lambda *a, **k: scraper)
+        monkeypatch.chdir(tmp_path)
+        argv = ["jobscraper", "schedule", "-e", "a@b.c", "-k", "python", "-l", "Jakarta"]
+        argv += ["--state", "schedule.sqlite3", "--session", "session.json", "--once"]
+        monkeypatch.setattr(sys, "argv", argv)
+        main()
+
+    def test_saved_session_is_resumed(self, tmp_path, monkeypatch):
+        (tmp_path / "session.json").write_text('[{"name": "session", "value": "x"}]')
+        scraper = MagicMock(session_cookies=[{"name": "session", "value": "y"}])
+        scraper.resume_session.return_value = True
+        scraper.scrape_page.return_value = ([], False)
+
+        self.schedule(tmp_path, monkeypatch, scraper)
+
+        scraper.resume_session.assert_called_once_with([{"name": "session", "value": "x"}])
+        scraper.start_session.assert_not_called()
+        assert json.loads((tmp_path / "session.json").read_text())[0]["value"] == "y"
+
+    def test_no_otp_prompt_without_a_terminal(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.setattr(sys.stdin, "isatty", lambda: False, raising=False)
+        scraper = MagicMock()
+
+        self.schedule(tmp_path, monkeypatch, scraper)
+
+        scraper.start_session.assert_not_called()
+        scraper.scrape_page.assert_not_called()
+        assert "run jobscraper schedule once from a terminal" in capsys.readouterr().out
@@ -0,0 +1,82 @@
+import csv
+import gzip
+import json
+import pytest
+from jobscraper.exporter import export_to_csv
+from jobscraper.postprocess import join_export, merge_exports, secondary_path
+from jobscraper.store import DescriptionStore
+
+
+def job(job_id, jobstreet_id, requirements=None, title="Engineer"):
+    return {
+        "id": job_id,
+        "search_keyword": "python",
+        "job_title": title,
+        "job_url": f"https://id.jobstreet.com/id/job/{jobstreet_id}",
+        "job_requirements": requirements,
+    }
+
+
+def write_run(directory, stamp, jobs, store=None):
+    main_file = str(directory / f"jobstreet_main_{stamp}.csv")
+    sec_file = str(directory / f"jobstreet_sec_{stamp}.csv.gz")
+    export_to_csv(jobs, main_file, sec_file, description_store=store)
+    return main_file
+
+
+@pytest.mark.unit
+class TestStreamingJoin:
+    def test_secondary_path(self):
+        assert (
+            secondary_path("exports/jobstreet_main_20240101_000000.csv")
+            == "exports/jobstreet_sec_20240101_000000.csv.gz"
+        )
+
+    def test_join_skips_jobs_without_requirements(self, tmp_path):
+        main_file = write_run(
+            tmp_path, "1", [job(1, 11, "a"), job(2, 12), job(3, 13, "c")]
+        )
+
+        rows = list(join_export(main_file, secondary_path(main_file)))
+
+        assert [r["job_requirements"] for r in rows] == ["a", None, "c"]
+
+    def test_join_rejects_unsorted_main(self, tmp_path):
+        main_file = write_run(tmp_path, "1", [job(2, 12, "b"), job(1, 11, "a")])
+
+        with pytest.raises(ValueError):
+            list(join_export(main_file, secondary_path(main_file)))
+
+    def test_join_resolves_hashed_descriptions(self, tmp_path):
+        with DescriptionStore(str(tmp_path / "store.sqlite3")) as store:
+            main_file = write_run(tmp_path, "1", [job(1, 11, "shared text")], store)
+            rows = list(join_export(main_file, secondary_path(main_file), store))
+
+        assert rows[0]["job_requirements"] == "shared text"
+
+
+@pytest.mark.unit
+class TestMergeRuns:
+    def test_newest_run_wins_on_duplicates(self, tmp_path):
+        old_run = write_run(tmp_path, "1", [job(1, 11, "old"), job(2, 12, "b")])
+        new_run = write_run(tmp_path, "2", [job(1, 11, "new", title="Senior")])
+        out = str(tmp_path / "merged.jsonl")
+
+        written, duplicates = merge_exports([old_run, new_run], out)
+
+        rows = [json.loads(line) for line in open(out, encoding="utf-8")]
+        assert (written, duplicates) == (2, 1)
+        assert [(r["job_title"], r["job_requirements"]) for r in rows] == [
+            ("Senior", "new"),
+            ("Engineer", "b"),
+        ]
+
+    def test_output_format_choice(self, tmp_path):
+        run = write_run(tmp_path, "1", [job(1, 11, "a")])
+        out = str(tmp_path / "merged.csv.gz")
+
+        merge_exports([run], out, fmt="csv")
+
+        with gzip.open(out, "rt", newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert rows[0]["job_requirements"] == "a"
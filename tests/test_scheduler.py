@@ -0,0 +1,162 @@
+from datetime import date
+import os
+import pytest
+from unittest.mock import MagicMock
+from jobscraper.scheduler import (
+    CrawlScheduler,
+    load_session,
+    posted_rate,
+    run_schedule,
+    save_session,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def scheduler(tmp_path, clock):
+    return CrawlScheduler(
+        str(tmp_path / "schedule.sqlite3"),
+        budget_hours=0,
+        target_new=10,
+        min_interval=60,
+        max_interval=7 * 24 * 3600,
+        clock=clock,
+    )
+
+
+def job(jobstreet_id, posted=None):
+    return {
+        "job_url": f"https://id.jobstreet.com/id/job/{jobstreet_id}/",
+        "job_posted_date": posted,
+    }
+
+
+@pytest.mark.unit
+class TestPostedRate:
+    def test_counts_postings_of_the_last_week(self):
+        records = [
+            job(1, "19-10-2026"),
+            job(2, "13-10-2026"),
+            job(3, "12-10-2026"),
+            job(4, None),
+        ]
+
+        assert posted_rate(records, today=date(2026, 10, 19)) == pytest.approx(2 / 168)
+
+
+@pytest.mark.unit
+class TestCrawlScheduler:
+    def test_new_query_is_due_once(self, scheduler):
+        assert scheduler.add_query("python", "Jakarta Raya") is True
+        assert scheduler.add_query("python", "Jakarta Raya") is False
+
+        assert scheduler.due() == [("python", "Jakarta Raya")]
+
+    def test_mark_seen_returns_only_new_jobs(self, scheduler):
+        scheduler.mark_seen("python", "Jakarta Raya", [job(1), job(2)])
+
+        new = scheduler.mark_seen("python", "Jakarta Raya", [job(2), job(3)])
+
+        assert new == [job(3)]
+        assert scheduler.mark_seen("data", "Jakarta Raya", [job(2)]) == [job(2)]
+
+    def test_busy_query_is_crawled_more_often(self, scheduler, clock):
+        for keyword in ("python", "cobol"):
+            scheduler.add_query(keyword, "Jakarta Raya")
+            scheduler.record_crawl(keyword, "Jakarta Raya", [], 0, clock.now, 60)
+
+        clock.now += 3600
+        scheduler.record_crawl("python", "Jakarta Raya", [], 20, clock.now, 60)
+        scheduler.record_crawl("cobol", "Jakarta Raya", [], 1, clock.now, 60)
+
+        plan = {q["keyword"]: q["interval"] for q in scheduler.summary()}
+        # 10 new jobs per hour vs 0.5 after smoothing
+        assert plan["python"] == pytest.approx(3600)
+        assert plan["cobol"] == pytest.approx(72000)
+        assert scheduler.due() == []
+
+    def test_budget_stretches_intervals(self, scheduler, clock):
+        scheduler.budget_hours = 1
+        scheduler.add_query("python", "Jakarta Raya")
+        scheduler.record_crawl("python", "Jakarta Raya", [], 0, clock.now, 600)
+        clock.now += 600
+        scheduler.record_crawl("python", "Jakarta Raya", [], 100, clock.now, 600)
+
+        # 300 new jobs per hour, 10 minute crawls every 2 minutes need 120 hours a day
+        assert scheduler.scale == pytest.approx(120)
+        assert scheduler.summary()[0]["interval"] == pytest.approx(14400)
+
+    def test_nothing_due_once_budget_is_spent(self, scheduler, clock):
+        scheduler.budget_hours = 1
+        scheduler.add_query("python", "Jakarta Raya")
+        scheduler.add_query("data", "Jakarta Raya")
+        scheduler.record_crawl("python", "Jakarta Raya", [], 0, clock.now, 3600)
+
+        assert scheduler.due() == []
+        assert scheduler.seconds_until_due() == pytest.approx(24 * 3600)
+
+    def test_postponed_query_keeps_its_rate(self, scheduler, clock):
+        scheduler.add_query("python", "Jakarta Raya")
+
+        scheduler.postpone("python", "Jakarta Raya")
+
+        assert scheduler.due() == []
+        clock.now += 60
+        assert scheduler.due() == [("python", "Jakarta Raya")]
+
+
+@pytest.mark.unit
+class TestRunSchedule:
+    def test_stops_paging_when_a_page_has_nothing_new(self, scheduler):
+        scheduler.add_query("python", "Jakarta Raya")
+        scheduler.mark_seen("python", "Jakarta Raya", [job(3)])
+        pages = {1: [job(1), job(2)], 2: [job(3)], 3: [job(4)]}
+        scraper = MagicMock()
+        scraper.scrape_page.side_effect = lambda keyword, location, page, first_id: (
+            pages[page],
+            True,
+        )
+        sink = MagicMock()
+
+        crawls = run_schedule(scheduler, scraper, sink, once=True)
+
+        assert crawls == 1
+        assert scraper.scrape_page.call_count == 2
+        assert sink.call_count == 2
+        assert scheduler.summary()[0]["crawls"] == 1
+
+    def test_failed_crawl_is_postponed(self, scheduler):
+        scheduler.add_query("python", "Jakarta Raya")
+        scraper = MagicMock()
+        scraper.scrape_page.side_effect = Exception("wedged")
+
+        assert run_schedule(scheduler, scraper, MagicMock(), once=True) == 0
+        assert scheduler.due() == []
+        assert scheduler.summary()[0]["crawls"] == 0
+
+
+@pytest.mark.unit
+class TestSession:
+    def test_cookies_are_kept_private(self, tmp_path):
+        path = str(tmp_path / "session.json")
+        cookies = [{"name": "session", "value": "x", "domain": "id.jobstreet.com"}]
+
+        save_session(cookies, path)
+
+        assert load_session(path) == cookies
+        assert os.stat(path).st_mode & 0o777 == 0o600
+
+    def test_missing_session(self, tmp_path):
+        assert load_session(str(tmp_path / "session.json")) == []
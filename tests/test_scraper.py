@@ -5,8 +5,11 @@ from selenium.common.exceptions import (
     StaleElementReferenceException,
     ElementClickInterceptedException,
     NoSuchElementException,
+    TimeoutException,
 )
 from jobscraper.scraper import JobScraper
+from jobscraper.recycling import BrowserHealth
+from jobscraper.governor import PolitenessGovernor
 from selenium.webdriver.common.keys import Keys
 
 
@@ -25,6 +28,24 @@ def scraper(mock_driver):
     return scraper
 
 
+@pytest.mark.unit
+class TestFixedOtp:
+    def test_invalid_otp_rejected(self, mock_driver):
+        with patch("jobscraper.scraper.init_driver", return_value=mock_driver):
+            with pytest.raises(ValueError):
+                JobScraper(email="bismillah@email.com", otp="12345")
+
+    def test_invalid_fixed_otp_counts_as_failed_attempt(self, scraper):
+        scraper.otp = "12345"
+        scraper._find_element_wait = MagicMock()
+
+        with patch("builtins.input") as mock_input:
+            assert scraper._otp() is False
+
+        mock_input.assert_not_called()
+        scraper._find_element_wait.assert_not_called()
+
+
 @pytest.mark.unit
 class TestClickElement:
     def test_click_element_success(self, scraper):
@@ -103,6 +124,17 @@ class TestDateParsing:
         result = scraper._parse_posted_date("5 hours ago")
         assert result is None
 
+    def test_parse_posted_date_unknown_text(self, scraper):
+        assert scraper._parse_posted_date("Posted kemarin") is None
+
+    def test_parse_applied_link(self, scraper):
+        url = "https://id.jobstreet.com/id/python-jobs?jobId=123&page=2"
+
+        assert scraper._parse_applied_link(url) == (
+            "https://id.jobstreet.com/id/job/123/?ref=applied"
+        )
+        assert scraper._parse_applied_link("https://id.jobstreet.com/id/python-jobs") is None
+
 
 @pytest.mark.unit
 class TestLogin:
@@ -152,9 +184,9 @@ class TestLogin:
         otp_input = MagicMock()
         home_page = MagicMock()
 
-        scraper._find_element_wait = MagicMock(
-            side_effect=[otp_input, NoSuchElementException(), home_page]
-        )
+        scraper._find_element_wait = MagicMock(side_effect=[otp_input, home_page])
+        scraper.driver.find_elements.return_value = []
+        scraper.governor = MagicMock()
 
         with patch("builtins.input", return_value="123456"):
             with patch("time.sleep"):
@@ -162,22 +194,16 @@ class TestLogin:
 
         assert result is True
         assert otp_input.send_keys.call_count == 6
+        # no alert after a good code is expected, not a timeout
+        scraper.governor.record_signal.assert_not_called()
 
     def test_otp_failure_retry(self, scraper):
         otp_input = MagicMock()
         otp_alert = MagicMock()
         otp_alert.text = "invalid code"
 
-        scraper._find_element_wait = MagicMock(
-            side_effect=[
-                otp_input,
-                otp_alert,
-                otp_input,
-                otp_alert,
-                otp_input,
-                otp_alert,
-            ]
-        )
+        scraper._find_element_wait = MagicMock(return_value=otp_input)
+        scraper.driver.find_elements.return_value = [otp_alert]
 
         with patch("builtins.input", return_value="123456"):
             with patch("time.sleep"):
@@ -231,10 +257,7 @@ class TestFindJobCards:
 
         results = scraper._find_job_cards()
 
-        assert len(results) == 3
-        assert results[0].get_attribute("id") == "jobcard-1"
-        assert results[1].get_attribute("id") == "jobcard-2"
-        assert results[2].get_attribute("id") == "jobcard-3"
+        assert results == [("jobcard-1", card1), ("jobcard-2", card2), ("jobcard-3", card3)]
 
     def test_find_job_cards_missing(self, scraper):
         scraper._find_element_wait = MagicMock(side_effect=NoSuchElementException())
@@ -242,6 +265,7 @@ class TestFindJobCards:
         result = scraper._find_job_cards()
 
         assert result == []
+        assert scraper.keyword_incomplete is True
 
 
 @pytest.mark.unit
@@ -268,6 +292,17 @@ class TestNextPage:
 
         assert result is False
         assert next_btn.get_attribute("aria-hidden") == "true"
+        assert scraper.keyword_incomplete is False
+
+    def test_next_page_not_loaded(self, scraper):
+        next_btn = MagicMock()
+        next_btn.get_attribute.return_value = "false"
+        scraper._find_element_wait = MagicMock(return_value=next_btn)
+        scraper._click_element = MagicMock(return_value=True)
+        scraper._wait_split_view_loaded = MagicMock(return_value=False)
+
+        assert scraper._next_page() is False
+        assert scraper.keyword_incomplete is True
 
     def test_next_page_missing(self, scraper):
         scraper._find_element_wait = MagicMock(side_effect=NoSuchElementException())
@@ -276,3 +311,382 @@ class TestNextPage:
 
         assert result is False
         scraper._find_element_wait.assert_called_once()
+
+
+@pytest.mark.unit
+class TestCardRecovery:
+    @pytest.fixture(autouse=True)
+    def no_sleep(self):
+        with patch("jobscraper.scraper.time.sleep"):
+            yield
+
+    def test_extract_card_first_try(self, scraper):
+        card = MagicMock()
+        scraper._extract_job_details = MagicMock(return_value={"job_title": "a"})
+
+        result = scraper._extract_card(card, "jobcard-1")
+
+        assert result == {"job_title": "a"}
+        scraper._extract_job_details.assert_called_once_with(card)
+
+    def test_extract_card_relocates_stale_card(self, scraper):
+        card = MagicMock()
+        fresh_card = MagicMock()
+        scraper.page_url = "https://id.jobstreet.com/id/python-jobs"
+        scraper._find_element_wait = MagicMock(return_value=fresh_card)
+        scraper._extract_job_details = MagicMock(
+            side_effect=[StaleElementReferenceException(), {"job_title": "a"}]
+        )
+
+        result = scraper._extract_card(card, "jobcard-3")
+
+        assert result == {"job_title": "a"}
+        scraper._find_element_wait.assert_called_once_with("id", "jobcard-3")
+        scraper._extract_job_details.assert_called_with(fresh_card)
+
+    def test_extract_card_reloads_page(self, scraper):
+        scraper.page_url = "https://id.jobstreet.com/id/python-jobs"
+        scraper._find_element_wait = MagicMock(return_value=MagicMock())
+        scraper._wait_split_view_loaded = MagicMock(return_value=True)
+        scraper._extract_job_details = MagicMock(
+            side_effect=[None, None, None, {"job_title": "a"}]
+        )
+
+        result = scraper._extract_card(MagicMock(), "jobcard-1")
+
+        assert result == {"job_title": "a"}
+        scraper.driver.get.assert_called_once_with(scraper.page_url)
+
+    def test_extract_card_skipped_after_all_steps(self, scraper):
+        scraper.page_url = "https://id.jobstreet.com/id/python-jobs"
+        scraper._find_element_wait = MagicMock(side_effect=NoSuchElementException())
+        scraper._extract_job_details = MagicMock(return_value=None)
+        scraper._wait_split_view_loaded = MagicMock(return_value=True)
+        new_driver = MagicMock()
+
+        with patch("jobscraper.scraper.init_driver", return_value=new_driver):
+            result = scraper._extract_card(MagicMock(), "jobcard-1")
+
+        assert result is None
+        assert scraper.skipped_cards == [
+            {"card_id": "jobcard-1", "page_url": scraper.page_url}
+        ]
+
+    def test_cards_after_a_recovery_are_located_again(self, scraper, mock_driver):
+        cards = {f"jobcard-{i}": MagicMock(name=f"old-{i}") for i in (1, 2, 3)}
+        fresh = {f"jobcard-{i}": MagicMock(name=f"fresh-{i}") for i in (1, 2, 3)}
+        scraper._find_job_cards = MagicMock(return_value=list(cards.items()))
+        scraper._locate_card = MagicMock(side_effect=lambda card_id: fresh[card_id])
+        scraper._wait_split_view_loaded = MagicMock(return_value=True)
+        mock_driver.current_url = "https://id.jobstreet.com/id/python-jobs?page=1"
+
+        def extract(card):
+            # card 1 needs a reload, which leaves the other old elements stale
+            if card in cards.values() and card is not cards["jobcard-1"]:
+                raise StaleElementReferenceException()
+            if card is cards["jobcard-1"]:
+                return None
+            return {"job_title": card._extract_mock_name()}
+
+        scraper._extract_job_details = MagicMock(side_effect=extract)
+        scraper.retry_policies = {"reload": scraper.retry_policies["reload"]}
+
+        records = list(scraper._scrape_page_cards("python", 1, 1))
+
+        assert [r["job_title"] for r in records] == ["fresh-1", "fresh-2", "fresh-3"]
+        assert [r["id"] for r in records] == [1, 2, 3]
+        assert scraper.skipped_cards == []
+        used = [c.args[0] for c in scraper._extract_job_details.call_args_list]
+        assert cards["jobcard-2"] not in used and cards["jobcard-3"] not in used
+        mock_driver.get.assert_called_once_with(mock_driver.current_url)
+
+    def test_unexpected_error_skips_only_that_card(self, scraper, mock_driver):
+        cards = [(f"jobcard-{i}", MagicMock(name=f"card-{i}")) for i in (1, 2)]
+        scraper._find_job_cards = MagicMock(return_value=cards)
+        scraper._extract_job_details = MagicMock(
+            side_effect=[IndexError("list index out of range"), {"job_title": "b"}]
+        )
+        mock_driver.current_url = "https://id.jobstreet.com/id/python-jobs?page=1"
+
+        records = list(scraper._scrape_page_cards("python", 1, 1))
+
+        assert [r["job_title"] for r in records] == ["b"]
+        assert [c["card_id"] for c in scraper.skipped_cards] == ["jobcard-1"]
+        mock_driver.get.assert_not_called()
+
+    def test_restart_driver_restores_session(self, scraper, mock_driver):
+        scraper.page_url = "https://id.jobstreet.com/id/python-jobs?page=2"
+        mock_driver.get_cookies.return_value = [{"name": "session", "value": "x"}]
+        scraper._wait_split_view_loaded = MagicMock(return_value=True)
+        new_driver = MagicMock()
+
+        with patch("jobscraper.scraper.init_driver", return_value=new_driver):
+            scraper._restart_driver()
+
+        mock_driver.quit.assert_called_once()
+        assert scraper.driver is new_driver
+        new_driver.add_cookie.assert_called_once_with({"name": "session", "value": "x"})
+        new_driver.get.assert_has_calls(
+            [call(scraper.url), call("https://id.jobstreet.com/id/python-jobs?page=2")]
+        )
+
+    def test_remember_page_drops_job_id(self, scraper, mock_driver):
+        mock_driver.current_url = (
+            "https://id.jobstreet.com/id/python-jobs?jobId=123&page=2&sortmode=ListedDate"
+        )
+
+        scraper._remember_page()
+
+        assert (
+            scraper.page_url
+            == "https://id.jobstreet.com/id/python-jobs?page=2&sortmode=ListedDate"
+        )
+
+
+@pytest.mark.unit
+class TestGovernorSignals:
+    def test_timeout_signals_governor(self, scraper):
+        scraper.governor = MagicMock()
+
+        with patch("jobscraper.scraper.WebDriverWait") as mock_wait:
+            mock_wait.return_value.until.side_effect = TimeoutException()
+            with pytest.raises(NoSuchElementException):
+                scraper._find_element_wait("css selector", "div")
+
+        scraper.governor.record_signal.assert_called_once_with("timeout")
+
+    def test_redirect_signals_governor(self, scraper, mock_driver):
+        scraper.governor = MagicMock()
+        mock_driver.current_url = "https://id.jobstreet.com/captcha?from=search"
+
+        with patch("jobscraper.scraper.WebDriverWait") as mock_wait:
+            mock_wait.return_value.until.side_effect = TimeoutException()
+            with pytest.raises(NoSuchElementException):
+                scraper._find_element_wait("css selector", "div")
+
+        scraper.governor.record_signal.assert_called_once_with("redirect")
+
+    def test_pacing_waits_are_not_slow_responses(self, scraper, tmp_path):
+        clock = [1_700_000_000.0]
+
+        def sleep(seconds):
+            clock[0] += seconds
+
+        # one slot every 100 seconds, far beyond the 8 second latency target
+        scraper.governor = PolitenessGovernor(
+            state_path=str(tmp_path / "governor.json"), initial_rate=0.01, sleep=sleep
+        )
+
+        def extract(card):
+            scraper._click_element(card)
+            clock[0] += 1.0
+            return {"job_title": "a"}
+
+        scraper._extract_job_details = MagicMock(side_effect=extract)
+
+        with patch("jobscraper.scraper.time.time", side_effect=lambda: clock[0]):
+            for _ in range(3):
+                scraper._extract_card(MagicMock(), "jobcard-1")
+
+        assert scraper.governor.waited > 50
+        assert scraper.governor.latency == pytest.approx(1.0)
+        assert scraper.governor.signals == {}
+
+    def test_click_is_paced(self, scraper):
+        scraper.governor = MagicMock()
+
+        scraper._click_element(MagicMock())
+
+        scraper.governor.acquire.assert_called_once()
+
+
+@pytest.mark.unit
+class TestScrapePage:
+    def test_search_url(self, scraper):
+        url = scraper.search_url("python developer", "Jakarta Raya", 3)
+
+        assert url == (
+            "https://id.jobstreet.com/id/python-developer-jobs/in-Jakarta-Raya"
+            "?sortmode=ListedDate&page=3"
+        )
+
+    def test_scrape_page_returns_records_and_next(self, scraper):
+        scraper._wait_split_view_loaded = MagicMock(return_value=True)
+        scraper._find_job_cards = MagicMock(
+            return_value=[("jobcard-1", MagicMock()), ("jobcard-2", MagicMock())]
+        )
+        scraper._extract_card = MagicMock(side_effect=[{"job_title": "a"}, None])
+        scraper._has_next_page = MagicMock(return_value=True)
+
+        records, has_next = scraper.scrape_page("python", "Jakarta Raya", 2, first_id=7)
+
+        assert records == [{"id": 7, "search_keyword": "python", "job_title": "a"}]
+        assert has_next is True
+        scraper.driver.get.assert_called_once_with(
+            scraper.search_url("python", "Jakarta Raya", 2)
+        )
+
+    def test_has_next_page_without_pagination(self, scraper, mock_driver):
+        scraper.governor = MagicMock()
+        mock_driver.find_elements.return_value = []
+
+        assert scraper._has_next_page() is False
+        scraper.governor.record_signal.assert_not_called()
+
+
+@pytest.mark.unit
+class TestResumeSession:
+    def test_resume_with_saved_cookies(self, scraper, mock_driver):
+        cookies = [{"name": "session", "value": "x"}]
+        scraper._find_element_wait = MagicMock()
+        mock_driver.find_elements.return_value = []
+        mock_driver.get_cookies.return_value = cookies
+
+        assert scraper.resume_session(cookies) is True
+
+        mock_driver.add_cookie.assert_called_once_with(cookies[0])
+        assert scraper.session_cookies == cookies
+
+    def test_expired_session_shows_sign_in(self, scraper, mock_driver):
+        scraper._find_element_wait = MagicMock()
+        mock_driver.find_elements.return_value = [MagicMock()]
+
+        assert scraper.resume_session([{"name": "session", "value": "x"}]) is False
+        assert scraper.session_cookies == []
+
+
+@pytest.mark.unit
+class TestBrowserRecycling:
+    def test_health_detects_latency_trend(self):
+        health = BrowserHealth(window=3, slowdown=1.5, max_memory_mb=None)
+        for seconds in (1.0, 1.0, 1.0, 1.2, 1.3):
+            health.record_card(seconds)
+        assert health.recycle_reason() is None
+
+        for seconds in (2.0, 2.0, 2.0):
+            health.record_card(seconds)
+
+        assert "latency" in health.recycle_reason()
+
+    def test_health_memory_and_card_limits(self):
+        health = BrowserHealth(max_memory_mb=1000, max_cards=2)
+
+        assert "memory" in health.recycle_reason(memory_mb=1500)
+        health.record_card(1.0)
+        health.record_card(1.0)
+        assert "cards" in health.recycle_reason()
+
+    def test_recycle_between_pages_keeps_session(self, scraper, mock_driver):
+        scraper.health = BrowserHealth(max_cards=1)
+        scraper.health.record_card(1.0)
+        scraper.page_url = "https://id.jobstreet.com/id/python-jobs?page=4"
+        mock_driver.get_cookies.return_value = [{"name": "session", "value": "x"}]
+        scraper._wait_split_view_loaded = MagicMock(return_value=True)
+        scraper._login = MagicMock()
+        new_driver = MagicMock()
+
+        with patch("jobscraper.scraper.init_driver", return_value=new_driver):
+            recycled = scraper._maybe_recycle()
+
+        assert recycled is True
+        assert scraper.driver is new_driver
+        assert scraper.health.cards == 0
+        assert scraper.health.recycles == 1
+        new_driver.get.assert_called_with(scraper.page_url)
+        scraper._login.assert_not_called()
+
+    def test_governor_backoff_does_not_recycle(self, scraper, tmp_path):
+        clock = [1_700_000_000.0]
+
+        def sleep(seconds):
+            clock[0] += seconds
+
+        scraper.governor = PolitenessGovernor(
+            state_path=str(tmp_path / "governor.json"), initial_rate=1.0, sleep=sleep
+        )
+        scraper.health = BrowserHealth(window=3, slowdown=1.5, max_memory_mb=None)
+        cards = [(f"jobcard-{i}", MagicMock()) for i in range(1, 10)]
+        scraper._find_job_cards = MagicMock(return_value=cards)
+
+        def extract(card):
+            scraper._click_element(card)
+            clock[0] += 1.0
+            return {"job_title": "a"}
+
+        scraper._extract_job_details = MagicMock(side_effect=extract)
+
+        with patch("jobscraper.scraper.time.time", side_effect=lambda: clock[0]):
+            records = scraper._scrape_page_cards("python", 1, 1)
+            next(records)
+            next(records)
+            next(records)
+            # a timeout halves the rate twice, so the next slots are 4s apart
+            scraper.governor.record_signal("timeout")
+            scraper.governor.record_signal("timeout")
+            rest = list(records)
+
+        assert len(rest) == 6
+        assert scraper.governor.waited > 5
+        assert scraper.health.recent_median == pytest.approx(1.0)
+        assert scraper.health.recycle_reason() is None
+
+    def test_no_recycle_when_healthy(self, scraper, mock_driver):
+        scraper.health = BrowserHealth()
+
+        assert scraper._maybe_recycle() is False
+        mock_driver.quit.assert_not_called()
+
+
+@pytest.mark.unit
+class TestPrefetch:
+    def test_start_prefetch_opens_background_tab(self, scraper, mock_driver):
+        next_btn = MagicMock()
+        next_btn.get_attribute.side_effect = lambda name: {
+            "aria-hidden": "false",
+            "href": "https://id.jobstreet.com/id/python-jobs?page=2",
+        }[name]
+        mock_driver.find_elements.return_value = [next_btn]
+        type(mock_driver).current_window_handle = property(
+            lambda d: "tab-2" if d.switch_to.new_window.called else "tab-1"
+        )
+
+        prefetch = scraper._start_prefetch()
+
+        assert prefetch == {
+            "handle": "tab-2",
+            "url": "https://id.jobstreet.com/id/python-jobs?page=2",
+        }
+        mock_driver.switch_to.new_window.assert_called_once_with("tab")
+        mock_driver.execute_script.assert_called_once_with(
+            "window.location.href = arguments[0];", prefetch["url"]
+        )
+        mock_driver.switch_to.window.assert_called_once_with("tab-1")
+
+    def test_start_prefetch_last_page(self, scraper, mock_driver):
+        next_btn = MagicMock()
+        next_btn.get_attribute.return_value = "true"
+        mock_driver.find_elements.return_value = [next_btn]
+
+        assert scraper._start_prefetch() is None
+        mock_driver.switch_to.new_window.assert_not_called()
+
+    def test_finish_prefetch_switches_tab(self, scraper, mock_driver):
+        mock_driver.window_handles = ["tab-1", "tab-2"]
+        scraper._wait_split_view_loaded = MagicMock(return_value=True)
+
+        result = scraper._finish_prefetch({"handle": "tab-2", "url": "next"})
+
+        assert result is True
+        mock_driver.close.assert_called_once()
+        mock_driver.switch_to.window.assert_called_once_with("tab-2")
+        mock_driver.get.assert_not_called()
+
+    def test_finish_prefetch_falls_back_to_navigation(self, scraper, mock_driver):
+        mock_driver.window_handles = ["tab-9"]
+        scraper._wait_split_view_loaded = MagicMock(return_value=True)
+
+        result = scraper._finish_prefetch({"handle": "tab-2", "url": "next"})
+
+        assert result is True
+        mock_driver.close.assert_not_called()
+        mock_driver.get.assert_called_once_with("next")
@@ -0,0 +1,73 @@
+import re
+import urllib.error
+import urllib.request
+import pytest
+from jobscraper.exporter import jobstreet_job_id
+from jobscraper.simulator import JobStreetSimulator
+
+
+@pytest.fixture
+def simulator():
+    with JobStreetSimulator(jobs_per_query=45, per_page=30) as sim:
+        yield sim
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.status, response.headers, response.read().decode("utf-8")
+
+
+def search(simulator, page):
+    return fetch(
+        f"{simulator.url}id/python-developer-jobs/in-Jakarta-Raya"
+        f"?sortmode=ListedDate&page={page}"
+    )[2]
+
+
+@pytest.mark.unit
+class TestJobStreetSimulator:
+    def test_results_pages_and_pagination(self, simulator):
+        first = search(simulator, 1)
+        last = search(simulator, 2)
+
+        assert len(re.findall(r'<article id="jobcard-\d+"', first)) == 30
+        assert len(re.findall(r'<article id="jobcard-\d+"', last)) == 15
+        assert 'data-automation="totalJobsCount">45<' in first
+        assert 'aria-label="Selanjutnya" aria-hidden="false"' in first
+        assert 'aria-label="Selanjutnya" aria-hidden="true"' in last
+        assert 'data-automation="initialView"' in first
+
+    def test_same_search_lists_same_jobs(self, simulator):
+        ids = re.findall(r'data-job-id="(\d+)"', search(simulator, 1))
+
+        assert ids == re.findall(r'data-job-id="(\d+)"', search(simulator, 1))
+
+    def test_job_details_markup(self, simulator):
+        job_id = re.search(r'data-job-id="(\d+)"', search(simulator, 1)).group(1)
+
+        _, _, details = fetch(f"{simulator.url}api/jobs/{job_id}")
+
+        assert 'data-automation="job-detail-title">Python Developer' in details
+        assert 'data-automation="jobAdDetails"' in details
+        apply_link = re.search(r'job-detail-apply" href="([^"]+)"', details).group(1)
+        assert apply_link.startswith(simulator.url)
+        assert jobstreet_job_id(apply_link.split("apply")[0]) == job_id
+
+    def test_otp_verification(self, simulator):
+        with pytest.raises(urllib.error.HTTPError) as error:
+            fetch(f"{simulator.url}login/verify?otp=000000")
+        assert error.value.code == 401
+
+        status, headers, _ = fetch(f"{simulator.url}login/verify?otp=123456")
+        assert status == 200
+        assert "session=simulated" in headers["Set-Cookie"]
+
+    def test_throttling_redirects_to_challenge(self):
+        with JobStreetSimulator(throttle_rps=0.01) as sim:
+            fetch(sim.url)
+            with pytest.raises(urllib.error.HTTPError) as error:
+                fetch(sim.url)
+
+        assert error.value.code == 429
+        assert "/challenge" in error.value.url
+        assert sim.throttled == 1
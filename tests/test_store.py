@@ -0,0 +1,67 @@
+import csv
+import gzip
+import pytest
+from jobscraper.exporter import export_to_csv
+from jobscraper.store import DescriptionStore, description_hash
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = DescriptionStore(str(tmp_path / "descriptions.sqlite3"))
+    yield store
+    store.close()
+
+
+@pytest.mark.unit
+class TestDescriptionStore:
+    def test_hash_ignores_whitespace_differences(self):
+        assert description_hash("Python  developer\n\nJakarta ") == description_hash(
+            "Python developer Jakarta"
+        )
+
+    def test_put_returns_hash_and_get_roundtrip(self, store):
+        digest = store.put("Requirements: Python")
+
+        assert digest == description_hash("Requirements: Python")
+        assert store.get(digest) == "Requirements: Python"
+
+    def test_put_same_text_written_once(self, store):
+        store.put_many(["same text", "same  text", "other text"])
+
+        assert store.written == 2
+        assert store.reused == 1
+
+    def test_shared_across_runs(self, tmp_path):
+        path = str(tmp_path / "descriptions.sqlite3")
+        with DescriptionStore(path) as first_run:
+            digest = first_run.put("boilerplate")
+
+        with DescriptionStore(path) as second_run:
+            assert second_run.put("boilerplate") == digest
+            assert second_run.written == 0
+            assert second_run.get(digest) == "boilerplate"
+
+    def test_get_unknown_hash(self, store):
+        assert store.get("deadbeef") is None
+
+
+@pytest.mark.unit
+class TestExportWithDescriptionStore:
+    def test_secondary_references_hash(self, tmp_path, store):
+        main_file = str(tmp_path / "main.csv")
+        sec_file = str(tmp_path / "sec.csv.gz")
+        batch = [
+            {"id": 1, "job_title": "a", "job_requirements": "desc"},
+            {"id": 2, "job_title": "b", "job_requirements": "desc"},
+            {"id": 3, "job_title": "c", "job_requirements": None},
+        ]
+
+        export_to_csv(batch, main_file, sec_file, description_store=store)
+
+        with gzip.open(sec_file, "rt", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert rows == [
+            {"job_id": "1", "description_hash": description_hash("desc")},
+            {"job_id": "2", "description_hash": description_hash("desc")},
+        ]
+        assert store.written == 1
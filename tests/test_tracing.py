@@ -0,0 +1,83 @@
+import json
+import pytest
+from unittest.mock import patch
+from selenium.webdriver.remote.webelement import WebElement
+from jobscraper.scraper import JobScraper
+from jobscraper.tracing import CommandBudgetExceeded, CommandTracer, summarize_trace
+
+
+@pytest.fixture
+def scraper(stub_driver):
+    with patch("jobscraper.scraper.init_driver", return_value=stub_driver):
+        return JobScraper(email="bismillah@email.com")
+
+
+@pytest.mark.unit
+class TestCommandTracer:
+    def test_records_commands_with_phase_and_site(self, tmp_path, stub_driver):
+        trace_file = tmp_path / "trace.jsonl"
+        tracer = CommandTracer(str(trace_file))
+        tracer.install(stub_driver)
+        scraper = JobScraper.__new__(JobScraper)
+
+        with tracer.phase("card", keyword="python", page=1, card="jobcard-1"):
+            scraper._get_element_text(WebElement(stub_driver, "root"), "h1")
+        tracer.close()
+
+        entries = [json.loads(line) for line in trace_file.read_text().splitlines()]
+        assert [e["command"] for e in entries] == ["findChildElement", "getElementText"]
+        assert entries[0]["phase"] == "card"
+        assert entries[0]["card"] == "jobcard-1"
+        assert entries[0]["site"].startswith("scraper.py:")
+
+    def test_summarize_trace_per_card_and_page(self, tmp_path, stub_driver):
+        trace_file = tmp_path / "trace.jsonl"
+        tracer = CommandTracer(str(trace_file))
+        tracer.install(stub_driver)
+        element = WebElement(stub_driver, "root")
+
+        with tracer.phase("page", keyword="python", page=1):
+            element.text
+            for card in ("jobcard-1", "jobcard-2"):
+                with tracer.phase("card", card=card):
+                    element.text
+                    element.text
+        tracer.close()
+
+        summary = summarize_trace(str(trace_file))
+        assert summary["pages"][("python", 1)]["commands"] == 5
+        assert summary["pages"][("python", 1)]["cards"] == 2
+        assert summary["cards"][("python", 1, "jobcard-2")]["commands"] == 2
+
+    def test_budget_exceeded(self, stub_driver):
+        tracer = CommandTracer()
+        tracer.install(stub_driver)
+
+        with pytest.raises(CommandBudgetExceeded):
+            with tracer.budget(1):
+                WebElement(stub_driver, "root").text
+                WebElement(stub_driver, "root").text
+
+    def test_uninstall_restores_driver(self, stub_driver):
+        tracer = CommandTracer()
+        tracer.install(stub_driver)
+        tracer.uninstall(stub_driver)
+
+        WebElement(stub_driver, "root").text
+
+        assert tracer.count == 0
+
+
+@pytest.mark.unit
+class TestExtractionBudgets:
+    def test_get_element_text_budget(self, scraper, stub_driver, command_budget):
+        with command_budget(stub_driver, 2, "_get_element_text"):
+            scraper._get_element_text(WebElement(stub_driver, "root"), "h1")
+
+    def test_company_profile_budget(self, scraper, stub_driver, command_budget):
+        details = WebElement(stub_driver, "details")
+
+        with command_budget(stub_driver, 11, "_extract_company_profile"):
+            profile = scraper._extract_company_profile(details)
+
+        assert profile["company_benefits"] == ["text", "text"]